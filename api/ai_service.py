@@ -2,7 +2,7 @@ import json
 import re
 import logging
 import base64
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from openai import OpenAI
 
 logging.basicConfig(level=logging.INFO)
@@ -111,7 +111,7 @@ class AutoMarketAIService:
     
     def estimate_price(self, item_name: str, description: str, 
                       condition: str, defects: str = "", 
-                      images: List[str] = None, 
+                      images: List[Union[str, bytes]] = None, 
                       pickup_address: str = "") -> Dict[str, Any]:
         
         # If OpenAI client is not available, use fallback pricing
@@ -276,25 +276,31 @@ Confidence: HIGH = common item with market data, MEDIUM = some data, LOW = rare/
             logger.error(f"Error in estimate_price: {str(e)}")
             return self._retry_pricing(item_name, description, condition, defects, pickup_address, "")
     
-    def _analyze_images(self, image_paths: List[str], item_name: str, description: str) -> Optional[Dict[str, Any]]:
+    def _analyze_images(self, image_paths: List[Union[str, bytes]], item_name: str, description: str) -> Optional[Dict[str, Any]]:
         """
         Analyze product images using GPT-4 Vision.
+        Images can be file paths or raw image bytes (skips the disk read).
         Note: Requires gpt-4-vision-preview or gpt-4-turbo (with vision) model
         """
         try:
             # Convert images to base64
             image_contents = []
-            for img_path in image_paths[:4]:  # OpenAI recommends max 4 images for best performance
+            for index, img_path in enumerate(image_paths[:4]):  # OpenAI recommends max 4 images for best performance
                 try:
-                    with open(img_path, "rb") as image_file:
-                        base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-                        image_contents.append({
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                                "detail": "high"
-                            }
-                        })
+                    if isinstance(img_path, (bytes, bytearray)):
+                        image_data = img_path
+                        img_path = f"<in-memory image {index + 1}>"
+                    else:
+                        with open(img_path, "rb") as image_file:
+                            image_data = image_file.read()
+                    base64_image = base64.b64encode(image_data).decode('utf-8')
+                    image_contents.append({
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{base64_image}",
+                            "detail": "high"
+                        }
+                    })
                     logger.info(f"Loaded image: {img_path}")
                 except Exception as e:
                     logger.warning(f"Failed to load {img_path}: {e}")
@@ -0,0 +1,55 @@
+"""
+Django management command to pre-render the legal pages to static HTML
+The rendered files can be served directly by the reverse proxy/CDN so legal
+page hits never reach Django
+"""
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.test import RequestFactory
+from api.legal_views import privacy_policy, terms_of_service, about_page
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+LEGAL_PAGES = (
+    ('privacy.html', privacy_policy),
+    ('terms.html', terms_of_service),
+    ('about.html', about_page),
+)
+
+
+class Command(BaseCommand):
+    help = 'Render privacy, terms and about pages to static HTML files for the reverse proxy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default=os.path.join(settings.STATIC_ROOT, 'legal'),
+            help='Directory to write the rendered pages to (default: STATIC_ROOT/legal)'
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+
+        request = RequestFactory().get('/')
+        rendered = 0
+
+        for filename, view in LEGAL_PAGES:
+            try:
+                response = view(request)
+            except TemplateDoesNotExist as e:
+                self.stdout.write(self.style.WARNING(f'⚠️  Skipping {filename}: template {e} not found'))
+                continue
+
+            file_path = os.path.join(output_dir, filename)
+            with open(file_path, 'wb') as f:
+                f.write(response.content)
+
+            rendered += 1
+            self.stdout.write(f'  ✅ Rendered {file_path}')
+
+        self.stdout.write(self.style.SUCCESS(f'🎉 Rendered {rendered} legal pages to {output_dir}'))
+        logger.info(f'Legal pages rendered: {rendered} files written to {output_dir}')
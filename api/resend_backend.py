@@ -2,19 +2,36 @@
 Custom Django Email Backend for Resend
 """
 import logging
+import threading
 from django.core.mail.backends.base import BaseEmailBackend
 from django.conf import settings
+import requests
 import resend
+from resend.version import get_version
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait on the Resend API when sending over an open connection
+RESEND_TIMEOUT = 30
+
+# Most emails Resend's batch endpoint accepts in one request
+RESEND_BATCH_SIZE = 100
+
+
 class ResendEmailBackend(BaseEmailBackend):
     """
     Custom email backend that uses Resend API to send emails
+
+    Like Django's SMTP backend, open() starts a connection (an HTTP session
+    with keep-alive) that every send goes through until close(), so a
+    connection kept by the caller skips the TCP/TLS handshake per email.
+    Without one, each send_messages() call opens and closes its own.
     """
     
     def __init__(self, fail_silently=False, **kwargs):
         super().__init__(fail_silently=fail_silently, **kwargs)
+        self.session = None
+        self._lock = threading.RLock()
         # Initialize Resend with API key
         resend.api_key = getattr(settings, 'RESEND_API_KEY', None)
         
@@ -23,6 +40,41 @@ class ResendEmailBackend(BaseEmailBackend):
             if not self.fail_silently:
                 raise ValueError("RESEND_API_KEY is required for Resend email backend")
     
+    def open(self):
+        """
+        Start a keep-alive session; returns True if a new one was opened
+        """
+        if self.session is not None:
+            return False
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {resend.api_key}",
+            "Content-Type": "application/json",
+            "User-Agent": f"resend-python:{get_version()}",
+        })
+        return True
+    
+    def close(self):
+        if self.session is None:
+            return
+        try:
+            self.session.close()
+        finally:
+            self.session = None
+    
+    def _send(self, email_data):
+        """POST one email over the open session; mirrors resend.Emails.send"""
+        return self._post("/emails", email_data)
+    
+    def _post(self, path, payload):
+        resp = self.session.post(f"{resend.api_url}{path}", json=payload, timeout=RESEND_TIMEOUT)
+        if "application/json" not in resp.headers.get("content-type", ""):
+            raise Exception(f"Resend API error: HTTP {resp.status_code}")
+        data = resp.json()
+        if resp.status_code != 200:
+            raise Exception(f"Resend API error: {data.get('message', data)}")
+        return data
+    
     def send_messages(self, email_messages):
         """
         Send multiple email messages using Resend API
@@ -30,67 +82,86 @@ class ResendEmailBackend(BaseEmailBackend):
         if not email_messages:
             return 0
         
+        with self._lock:
+            new_session = self.open()
+            try:
+                return self._send_messages(email_messages)
+            finally:
+                if new_session:
+                    self.close()
+    
+    def _email_data(self, message):
+        """Build the Resend API payload for one EmailMessage"""
+        email_data = {
+            "from": message.from_email or settings.DEFAULT_FROM_EMAIL,
+            "to": message.to,
+            "subject": message.subject,
+        }
+        
+        # Handle CC and BCC
+        if hasattr(message, 'cc') and message.cc:
+            email_data["cc"] = message.cc
+        if hasattr(message, 'bcc') and message.bcc:
+            email_data["bcc"] = message.bcc
+        
+        # Handle message body (HTML vs plain text)
+        if hasattr(message, 'alternatives') and message.alternatives:
+            # Look for HTML content in alternatives
+            for content, content_type in message.alternatives:
+                if content_type == 'text/html':
+                    email_data["html"] = content
+                    break
+            # Always include plain text as fallback
+            if message.body:
+                email_data["text"] = message.body
+        else:
+            # Plain text only
+            email_data["text"] = message.body
+        
+        # Handle attachments
+        if hasattr(message, 'attachments') and message.attachments:
+            attachments = []
+            for attachment in message.attachments:
+                if isinstance(attachment, tuple) and len(attachment) >= 2:
+                    filename, content, mimetype = attachment[0], attachment[1], attachment[2] if len(attachment) > 2 else None
+                    # Resend expects base64 encoded content for attachments
+                    import base64
+                    if isinstance(content, bytes):
+                        content_b64 = base64.b64encode(content).decode('utf-8')
+                    else:
+                        content_b64 = base64.b64encode(content.encode('utf-8')).decode('utf-8')
+                    
+                    attachment_data = {
+                        "filename": filename,
+                        "content": content_b64,
+                    }
+                    if mimetype:
+                        attachment_data["type"] = mimetype
+                    
+                    attachments.append(attachment_data)
+            
+            if attachments:
+                email_data["attachments"] = attachments
+        
+        return email_data
+    
+    def _send_messages(self, email_messages):
+        # The batch endpoint takes several emails per request but no attachments
+        if len(email_messages) > 1 and not any(getattr(m, 'attachments', None) for m in email_messages):
+            return self._send_batch(email_messages)
+        
         sent_count = 0
         
         for message in email_messages:
             try:
                 # Prepare email data for Resend API
-                email_data = {
-                    "from": message.from_email or settings.DEFAULT_FROM_EMAIL,
-                    "to": message.to,
-                    "subject": message.subject,
-                }
-                
-                # Handle CC and BCC
-                if hasattr(message, 'cc') and message.cc:
-                    email_data["cc"] = message.cc
-                if hasattr(message, 'bcc') and message.bcc:
-                    email_data["bcc"] = message.bcc
-                
-                # Handle message body (HTML vs plain text)
-                if hasattr(message, 'alternatives') and message.alternatives:
-                    # Look for HTML content in alternatives
-                    for content, content_type in message.alternatives:
-                        if content_type == 'text/html':
-                            email_data["html"] = content
-                            break
-                    # Always include plain text as fallback
-                    if message.body:
-                        email_data["text"] = message.body
-                else:
-                    # Plain text only
-                    email_data["text"] = message.body
-                
-                # Handle attachments
-                if hasattr(message, 'attachments') and message.attachments:
-                    attachments = []
-                    for attachment in message.attachments:
-                        if isinstance(attachment, tuple) and len(attachment) >= 2:
-                            filename, content, mimetype = attachment[0], attachment[1], attachment[2] if len(attachment) > 2 else None
-                            # Resend expects base64 encoded content for attachments
-                            import base64
-                            if isinstance(content, bytes):
-                                content_b64 = base64.b64encode(content).decode('utf-8')
-                            else:
-                                content_b64 = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-                            
-                            attachment_data = {
-                                "filename": filename,
-                                "content": content_b64,
-                            }
-                            if mimetype:
-                                attachment_data["type"] = mimetype
-                            
-                            attachments.append(attachment_data)
-                    
-                    if attachments:
-                        email_data["attachments"] = attachments
+                email_data = self._email_data(message)
                 
                 # Send email via Resend API
                 logger.info(f"Sending email to {email_data['to']} via Resend")
                 logger.info(f"Email data: From={email_data['from']}, Subject={email_data['subject']}")
                 
-                response = resend.Emails.send(email_data)
+                response = self._send(email_data)
                 
                 if response and hasattr(response, 'get') and response.get('id'):
                     logger.info(f"Email sent successfully via Resend. ID: {response.get('id')}")
@@ -105,4 +176,27 @@ class ResendEmailBackend(BaseEmailBackend):
                 if not self.fail_silently:
                     raise e
         
-        return sent_count
\ No newline at end of file
+        return sent_count
+    
+    def _send_batch(self, email_messages):
+        """
+        Send up to RESEND_BATCH_SIZE emails per request through /emails/batch.
+        Resend accepts or rejects each request as a whole.
+        """
+        sent_count = 0
+        
+        for start in range(0, len(email_messages), RESEND_BATCH_SIZE):
+            chunk = email_messages[start:start + RESEND_BATCH_SIZE]
+            try:
+                logger.info(f"Sending batch of {len(chunk)} emails via Resend")
+                response = self._post("/emails/batch", [self._email_data(m) for m in chunk])
+                sent = len(response.get('data') or [])
+                logger.info(f"Batch sent via Resend: {sent} emails")
+                sent_count += sent
+                
+            except Exception as e:
+                logger.error(f"Error sending email batch via Resend: {str(e)}")
+                if not self.fail_silently:
+                    raise e
+        
+        return sent_count
@@ -0,0 +1,82 @@
+"""
+URL routing helpers for the API URLconf
+"""
+from functools import lru_cache, partial
+
+from django.urls.conf import _path
+from django.urls.resolvers import RoutePattern, URLPattern, URLResolver
+
+
+class CachedReprURLPattern(URLPattern):
+    """URLPattern whose repr is built once (debug pages and logs call it a lot)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_repr = '<URLPattern %s>' % self.pattern.describe()
+
+    def __repr__(self):
+        return self._cached_repr
+
+
+class CachedURLResolver(URLResolver):
+    """
+    URLResolver that remembers resolve() results per path, so a repeated URL
+    skips the pattern scan. Only matches are cached (Resolver404 is raised
+    again each time), and the parent resolver builds a fresh ResolverMatch
+    from the cached one for every request.
+    """
+
+    def __init__(self, *args, cache_size=4096, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.resolve = lru_cache(maxsize=cache_size)(super().resolve)
+
+
+def cached(resolver, cache_size=4096):
+    """Wrap an include() route, e.g. cached(path('api/', include(...)))"""
+    return CachedURLResolver(
+        resolver.pattern,
+        resolver.urlconf_name,
+        resolver.default_kwargs,
+        resolver.app_name,
+        resolver.namespace,
+        cache_size=cache_size,
+    )
+
+
+def _route(route, view, kwargs=None, name=None, Pattern=RoutePattern):
+    url = _path(route, view, kwargs, name, Pattern)
+    if isinstance(url, URLPattern):
+        return CachedReprURLPattern(url.pattern, url.callback, url.default_args, url.name)
+    return url
+
+
+def with_prefetch(*lookups, select_related=()):
+    """
+    Class decorator declaring the related-object loading strategy of a
+    generic view at URL registration time.
+
+    Returns a subclass whose get_queryset() result is wrapped with
+    select_related()/prefetch_related(), so the view's own filtering is
+    left untouched.
+    """
+    def decorator(view_class):
+        def get_queryset(self):
+            queryset = super(prefetched, self).get_queryset()
+            if select_related:
+                queryset = queryset.select_related(*select_related)
+            if lookups:
+                queryset = queryset.prefetch_related(*lookups)
+            return queryset
+
+        prefetched = type(view_class.__name__, (view_class,), {
+            '__module__': view_class.__module__,
+            '__qualname__': view_class.__qualname__,
+            '__doc__': view_class.__doc__,
+            'get_queryset': get_queryset,
+        })
+        return prefetched
+    return decorator
+
+
+# Drop-in replacement for django.urls.path()
+path = partial(_route, Pattern=RoutePattern)
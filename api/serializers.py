@@ -1,10 +1,24 @@
 from rest_framework import serializers
 from .models import Product, ProductImage, SubmissionBatch, TempProduct, TempProductImage
+from django.db import transaction
 from django.utils import timezone
 from django.core.files.base import ContentFile
-import base64
 import uuid
 
+# pybase64 is a drop-in replacement with SIMD decoding; fall back to the stdlib
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+
+MIN_IMAGE_BYTES = 800
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+# Longest base64 text that can decode to MAX_IMAGE_BYTES, allowing for
+# MIME-style line breaks (CRLF every 76 characters)
+MAX_BASE64_LENGTH = (MAX_IMAGE_BYTES + 2) // 3 * 4
+MAX_BASE64_LENGTH += MAX_BASE64_LENGTH // 38
+
 
 class Base64ImageField(serializers.Field):
     """Custom field to handle base64 image data and regular file uploads"""
@@ -21,16 +35,21 @@ class Base64ImageField(serializers.Field):
                 if format_part.lower() not in ['jpeg', 'jpg', 'png', 'webp']:
                     raise serializers.ValidationError("Unsupported image format. Use JPEG, PNG, or WEBP.")
                 
+                # Reject oversized payloads before decoding so they are never
+                # copied into a second multi-megabyte buffer
+                if len(base64_string) > MAX_BASE64_LENGTH:
+                    raise serializers.ValidationError("Image is too large. Maximum size is 5MB.")
+                
                 # Decode base64
                 image_data = base64.b64decode(base64_string)
                 
                 # Validate file size (min 800 bytes, max 5MB) - reject tiny placeholder images
-                if len(image_data) < 800:  # Minimum 800 bytes to reject placeholder images
+                if len(image_data) < MIN_IMAGE_BYTES:  # Minimum 800 bytes to reject placeholder images
                     raise serializers.ValidationError(
                         f"Image is too small ({len(image_data)} bytes). Minimum size is 800 bytes. "
                         "Please upload a proper product image, not a placeholder."
                     )
-                if len(image_data) > 5 * 1024 * 1024:
+                if len(image_data) > MAX_IMAGE_BYTES:
                     raise serializers.ValidationError("Image is too large. Maximum size is 5MB.")
                 
                 # Create a file-like object
@@ -43,18 +62,26 @@ class Base64ImageField(serializers.Field):
                 raise serializers.ValidationError(f"Invalid base64 image data: {str(e)}")
         elif hasattr(data, 'read'):
             # Handle regular file upload
-            if data.size < 800:  # Minimum 800 bytes to reject placeholder images
+            if data.size < MIN_IMAGE_BYTES:  # Minimum 800 bytes to reject placeholder images
                 raise serializers.ValidationError(
                     f"Image is too small ({data.size} bytes). Minimum size is 800 bytes. "
                     "Please upload a proper product image, not a placeholder."
                 )
-            if data.size > 5 * 1024 * 1024:
+            if data.size > MAX_IMAGE_BYTES:
                 raise serializers.ValidationError("Image is too large. Maximum size is 5MB.")
             return data
         else:
             raise serializers.ValidationError("Invalid image format. Use base64 string or file upload.")
 
 
+def _read_image_bytes(image):
+    """Return the full content of a validated image file, leaving it rewound"""
+    image.seek(0)
+    data = image.read()
+    image.seek(0)
+    return data
+
+
 class ProductImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductImage
@@ -178,14 +205,16 @@ class ProductSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        # Create product images
-        for index, image in enumerate(uploaded_images):
-            ProductImage.objects.create(
+        # Create product images in one INSERT
+        ProductImage.objects.bulk_create([
+            ProductImage(
                 product=product,
                 image=image,
                 order=index,
                 is_primary=(index == 0)  # First image is primary
             )
+            for index, image in enumerate(uploaded_images)
+        ])
         
         # TODO: Call AI service to estimate price and update product
         # This would be done asynchronously in production
@@ -220,17 +249,18 @@ class SubmissionBatchSerializer(serializers.ModelSerializer):
         if 'request' in self.context and self.context['request'].user.is_authenticated:
             user = self.context['request'].user
         
-        # Create submission batch (can be anonymous)
-        batch = SubmissionBatch.objects.create(user=user, **validated_data)
-        
-        # Create products for this batch
-        for product_data in products_data:
-            product_serializer = ProductSerializer(
-                data=product_data, 
-                context={'request': self.context['request'], 'submission_batch': batch}
-            )
-            if product_serializer.is_valid():
-                product_serializer.save()
+        with transaction.atomic():
+            # Create submission batch (can be anonymous)
+            batch = SubmissionBatch.objects.create(user=user, **validated_data)
+            
+            # Create products for this batch
+            for product_data in products_data:
+                product_serializer = ProductSerializer(
+                    data=product_data, 
+                    context={'request': self.context['request'], 'submission_batch': batch}
+                )
+                if product_serializer.is_valid():
+                    product_serializer.save()
         
         return batch
 
@@ -432,14 +462,20 @@ class TempProductSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        # Create temporary product images
-        for index, image in enumerate(uploaded_images):
-            TempProductImage.objects.create(
+        # Keep the decoded bytes so the AI service doesn't have to read the
+        # files back from disk (storage may move uploaded temp files on save)
+        temp_product.uploaded_image_bytes = [_read_image_bytes(image) for image in uploaded_images]
+        
+        # Create temporary product images in one INSERT
+        TempProductImage.objects.bulk_create([
+            TempProductImage(
                 temp_product=temp_product,
                 image=image,
                 order=index,
                 is_primary=(index == 0)  # First image is primary
             )
+            for index, image in enumerate(uploaded_images)
+        ])
         
         return temp_product
 
@@ -506,39 +542,58 @@ class ContactOnlySerializer(serializers.Serializer):
         if 'request' in self.context and self.context['request'].user.is_authenticated:
             user = self.context['request'].user
         
-        # Create submission batch
-        batch = SubmissionBatch.objects.create(
-            user=user,
-            **validated_data
-        )
-        
-        # Convert temporary products to permanent products
-        temp_products = TempProduct.objects.filter(id__in=temp_product_ids)
-        for temp_product in temp_products:
-            # Create permanent product
-            product = Product.objects.create(
+        with transaction.atomic():
+            # Create submission batch
+            batch = SubmissionBatch.objects.create(
                 user=user,
-                submission_batch=batch,
-                title=temp_product.title,
-                description=temp_product.description,
-                condition=temp_product.condition,
-                defects=temp_product.defects,
-                estimated_value=temp_product.estimated_value,
-                min_price_range=temp_product.min_price_range,
-                max_price_range=temp_product.max_price_range,
-                confidence=temp_product.confidence
+                **validated_data
             )
             
+            # Convert temporary products to permanent products
+            temp_products = list(
+                TempProduct.objects.filter(id__in=temp_product_ids).prefetch_related('images')
+            )
+            products = Product.objects.bulk_create([
+                Product(
+                    user=user,
+                    submission_batch=batch,
+                    title=temp_product.title,
+                    description=temp_product.description,
+                    condition=temp_product.condition,
+                    defects=temp_product.defects,
+                    estimated_value=temp_product.estimated_value,
+                    min_price_range=temp_product.min_price_range,
+                    max_price_range=temp_product.max_price_range,
+                    confidence=temp_product.confidence
+                )
+                for temp_product in temp_products
+            ])
+            
             # Copy images from temporary to permanent
-            for temp_image in temp_product.images.all():
-                ProductImage.objects.create(
+            ProductImage.objects.bulk_create([
+                ProductImage(
                     product=product,
                     image=temp_image.image,
                     is_primary=temp_image.is_primary,
                     order=temp_image.order
                 )
+                for product, temp_product in zip(products, temp_products)
+                for temp_image in temp_product.images.all()
+            ])
             
-            # Delete temporary product (cascade will delete images)
-            temp_product.delete()
+            # Delete temporary products (cascade will delete images)
+            TempProduct.objects.filter(id__in=[tp.id for tp in temp_products]).delete()
         
-        return batch
\ No newline at end of file
+        return batch
+
+class CancelTempItemsSerializer(serializers.Serializer):
+    """
+    Payload for cancelling temporary products
+    Both fields are optional; with neither, expired temp products are cancelled
+    """
+    user_id = serializers.IntegerField(required=False, allow_null=True)
+    temp_product_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Specific temporary product IDs to cancel"
+    )
@@ -5,9 +5,13 @@ Simplified for basic workflow: user submission → admin approval → dual listi
 """
 
 import logging
+import threading
+from django.conf import settings
+from django.db import connection
 from django.utils import timezone
-from .models import Product
+from .models import Product, SubmissionBatch
 from .marketplace_service import MarketplaceService
+from .email_services import send_item_submission_emails
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +65,45 @@ def list_product_on_both_platforms(product_id):
         return {'success': False, 'error': str(e)}
 
 
+def send_submission_emails(batch_id):
+    """
+    Send the customer confirmation and admin notification emails for a submission batch
+    """
+    try:
+        batch = SubmissionBatch.objects.get(id=batch_id)
+
+        contact_info = {
+            'full_name': batch.full_name,
+            'email': batch.email,
+            'phone': batch.phone,
+            'pickup_date': batch.pickup_date.isoformat(),
+            'pickup_address': batch.pickup_address,
+            'privacy_policy_accepted': batch.privacy_policy_accepted
+        }
+
+        # Only the columns the email templates use, as plain dicts
+        submitted_items = list(batch.products.values(
+            'title', 'description', 'estimated_value', 'condition', 'confidence', 'defects'
+        ))
+        for item in submitted_items:
+            item['estimated_value'] = float(item['estimated_value'])
+            item['defects'] = item['defects'] or 'None'
+
+        email_results = send_item_submission_emails(
+            user_email=batch.email,
+            user_name=batch.full_name,
+            submitted_items=submitted_items,
+            contact_info=contact_info
+        )
+
+        logger.info(f"Emails sent for submission {batch_id}: {email_results}")
+        return email_results
+
+    except Exception as e:
+        logger.error(f"Email sending failed for submission {batch_id}: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
 # Optional: Celery task decorators for background processing (if Celery is installed)
 try:
     from celery import shared_task
@@ -72,7 +115,31 @@ try:
     @shared_task
     def list_product_task(product_id):
         return list_product_on_both_platforms(product_id)
+
+    @shared_task
+    def send_submission_emails_task(batch_id):
+        return send_submission_emails(batch_id)
         
 except ImportError:
     # Celery not available, tasks will run synchronously
-    logger.info("Celery not available, using synchronous task execution")
\ No newline at end of file
+    send_submission_emails_task = None
+    logger.info("Celery not available, using synchronous task execution")
+
+
+def _run_in_thread(func, *args):
+    try:
+        func(*args)
+    finally:
+        # The thread got its own DB connection; don't leave it open
+        connection.close()
+
+
+def queue_submission_emails(batch_id):
+    """
+    Send submission emails in the background so the request doesn't wait on the mail API.
+    Uses Celery when a broker is configured, otherwise a daemon thread.
+    """
+    if send_submission_emails_task is not None and getattr(settings, 'CELERY_BROKER_URL', None):
+        send_submission_emails_task.delay(batch_id)
+    else:
+        threading.Thread(target=_run_in_thread, args=(send_submission_emails, batch_id), daemon=True).start()
\ No newline at end of file
@@ -1,56 +1,85 @@
-from django.urls import path, include
+from django.db.models import Prefetch
+from django.urls import include
 from . import views
+from .models import Product
+from .routing import path, with_prefetch
 from .legal_views import privacy_policy, terms_of_service, about_page
 
 app_name = 'api'
 
 # Import test view removed - file doesn't exist
 
-urlpatterns = [
-    # Root API endpoint
-    path('', views.api_root, name='api-root'),
-    
-    # Test endpoint removed - view doesn't exist
-    
+# Class-based views are bound once here; the detail views keep going through
+# DRF's dispatch so authentication, permissions and exception handling apply.
+# Prefetch strategies are declared here, next to the route, so every list and
+# detail endpoint can be audited for N+1 queries in one place.
+_SUBMISSION_CREATE = views.SubmissionBatchCreateView.as_view()
+_SUBMISSION_LIST = with_prefetch(
+    # The list only needs each batch's item count and value total
+    Prefetch('products', queryset=Product.objects.only('id', 'submission_batch', 'estimated_value'))
+)(views.SubmissionBatchListView).as_view()
+_SUBMISSION_DETAIL = with_prefetch('products', 'products__images')(views.SubmissionBatchDetailView).as_view()
+_PRODUCT_LIST = with_prefetch('images')(views.UserProductListView).as_view()
+_PRODUCT_DETAIL = with_prefetch('images')(views.UserProductDetailView).as_view()
+
+# (route, view, name) - ordered by expected request volume, since Django
+# resolves them with a linear scan.
+_ROUTES = (
+    # Two-step submission flow
+    ('items/estimate/', views.item_price_estimate_with_images, 'item-estimate-with-images'),
+    ('submissions/contact-only/', views.contact_only_submission, 'contact-only-submission'),
+
     # User submission endpoints (No authentication required)
-    path('submissions/', views.SubmissionBatchCreateView.as_view(), name='create-submission'),
-    path('submissions/list/', views.SubmissionBatchListView.as_view(), name='list-submissions'),
-    path('submissions/<int:pk>/', views.SubmissionBatchDetailView.as_view(), name='submission-detail'),
-    path('submissions/<int:batch_id>/status/', views.check_submission_status, name='check-submission-status'),
-    
-    # User product endpoints
-    path('products/', views.UserProductListView.as_view(), name='list-products'),
-    path('products/<int:pk>/', views.UserProductDetailView.as_view(), name='product-detail'),
-    
-    # User dashboard
-    path('dashboard/', views.user_dashboard, name='user-dashboard'),
-    
+    ('submissions/', _SUBMISSION_CREATE, 'create-submission'),
+
     # AI Service endpoints
-    path('ai/price-estimate/', views.ai_price_estimate, name='ai-price-estimate'),
-    path('ai/detect-category/', views.ai_detect_category, name='ai-detect-category'),
-    path('ai/market-insights/', views.ai_market_insights, name='ai-market-insights'),
-    
-    # Two-step submission flow
-    path('items/estimate/', views.item_price_estimate_with_images, name='item-estimate-with-images'),
-    path('submissions/contact-only/', views.contact_only_submission, name='contact-only-submission'),
-    
+    ('ai/price-estimate/', views.ai_price_estimate, 'ai-price-estimate'),
+    ('ai/detect-category/', views.ai_detect_category, 'ai-detect-category'),
+    ('ai/market-insights/', views.ai_market_insights, 'ai-market-insights'),
+
     # Temporary products management
-    path('temp-products/cancel/', views.cancel_temp_items, name='cancel-temp-items'),
-    
-    # Enhanced Admin API
-    path('admin/', include('api.admin_urls')),
-    
-    # eBay Integration
-    path('ebay/', include('api.ebay_urls')),
-    
-    # Amazon SP-API Integration
-    path('amazon/', include('api.amazon_urls')),
-    
-    # Dual Marketplace Operations
-    path('marketplace/', include('api.marketplace_urls')),
-    
-    # Legal Pages
-    path('privacy/', privacy_policy, name='privacy-policy'),
-    path('terms/', terms_of_service, name='terms-of-service'),
-    path('about/', about_page, name='about-page'),
-]
\ No newline at end of file
+    ('temp-products/cancel/', views.cancel_temp_items, 'cancel-temp-items'),
+
+    # Submission lookups
+    ('submissions/<int:batch_id>/status/', views.check_submission_status, 'check-submission-status'),
+    ('submissions/list/', _SUBMISSION_LIST, 'list-submissions'),
+    ('submissions/<int:pk>/', _SUBMISSION_DETAIL, 'submission-detail'),
+
+    # User dashboard
+    ('dashboard/', views.user_dashboard, 'user-dashboard'),
+
+    # User product endpoints
+    ('products/', _PRODUCT_LIST, 'list-products'),
+    ('products/<int:pk>/', _PRODUCT_DETAIL, 'product-detail'),
+
+    # Root API endpoint
+    ('', views.api_root, 'api-root'),
+
+    # Legal Pages - `manage.py render_legal` writes these to STATIC_ROOT/legal/
+    # so the reverse proxy can serve them without a Django round-trip; the
+    # routes stay as the fallback.
+    ('privacy/', privacy_policy, 'privacy-policy'),
+    ('terms/', terms_of_service, 'terms-of-service'),
+    ('about/', about_page, 'about-page'),
+)
+
+# Test endpoint removed - view doesn't exist
+
+urlpatterns = tuple(
+    [
+        path(route, view, name=name)
+        for route, view, name in _ROUTES
+    ] + [
+        # Enhanced Admin API
+        path('admin/', include('api.admin_urls')),
+
+        # eBay Integration
+        path('ebay/', include('api.ebay_urls')),
+
+        # Amazon SP-API Integration
+        path('amazon/', include('api.amazon_urls')),
+
+        # Dual Marketplace Operations
+        path('marketplace/', include('api.marketplace_urls')),
+    ]
+)
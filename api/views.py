@@ -5,102 +5,166 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from django.db import transaction
-from django.http import JsonResponse
+from django.db.models.signals import post_delete, pre_delete
+from django.db.models import Count, DecimalField, Q, Sum, Value, prefetch_related_objects
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+import hashlib
+import json
 import logging
 import os
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
 
-from .models import Product, SubmissionBatch, TempProduct
+from .models import Product, SubmissionBatch, TempProduct, TempProductImage
 from .serializers import (
     SubmissionBatchSerializer, SubmissionBatchListSerializer,
     ProductSerializer, ProductStatusUpdateSerializer,
-    TempProductSerializer, ContactOnlySerializer
+    TempProductSerializer, ContactOnlySerializer, CancelTempItemsSerializer
 )
 from .ai_service import AutoMarketAIService
+from .tasks import queue_submission_emails
 
 logger = logging.getLogger(__name__)
 
+# Shared AI service - the OpenAI client keeps a connection pool, so build it
+# once per process rather than per request
+_ai_service = None
 
+
+def _get_ai():
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AutoMarketAIService()
+    return _ai_service
+
+
+def _ai_images(temp_product):
+    """
+    Images to send to the AI service: the bytes decoded by the serializer when
+    the product was just created, otherwise the stored file paths
+    """
+    image_bytes = getattr(temp_product, 'uploaded_image_bytes', None)
+    if image_bytes:
+        return image_bytes
+    return [img.image.path for img in temp_product.images.all()]
+
+
+# How long AI category/insight answers are reused for identical inputs
+AI_RESULT_CACHE_TIMEOUT = 60 * 60
+
+
+def _cached_ai_call(method_name, **kwargs):
+    """
+    Call an AI service method, reusing the result for identical (normalised)
+    arguments via the Django cache. Failures are not cached.
+    """
+    normalised = '|'.join(f'{k}={str(v).strip().lower()}' for k, v in sorted(kwargs.items()))
+    cache_key = f'ai_{method_name}_{hashlib.sha1(normalised.encode()).hexdigest()}'
+    result = cache.get(cache_key)
+    if result is None:
+        result = getattr(_get_ai(), method_name)(**kwargs)
+        cache.set(cache_key, result, AI_RESULT_CACHE_TIMEOUT)
+    return result
+
+
+# Upper bound on concurrent AI estimate calls for a multi-product request
+AI_ESTIMATE_WORKERS = 8
+
+
+# Static payload for api_root - built once at import instead of per request
+API_ROOT_DATA = {
+    'message': 'Auto Market API',
+    'version': '1.0',
+    'authentication_required': False,
+    'endpoints': {
+        # Two-step submission flow
+        'item_estimate': '/api/items/estimate/',  # Step 1: Get price estimation
+        'submissions': '/api/submissions/',        # Step 2: Submit with contact info
+        
+        # Other endpoints
+        'products': '/api/products/',
+        'ai_price_estimate': '/api/ai/price-estimate/',
+        'ai_detect_category': '/api/ai/detect-category/',
+        'ai_market_insights': '/api/ai/market-insights/',
+        'dashboard': '/api/dashboard/',
+        'admin': '/api/admin/'
+    },
+    'two_step_submission_flow': {
+        'description': 'Optimized for frontend state management',
+        'step_1': {
+            'endpoint': 'POST /api/items/estimate/',
+            'purpose': 'Get AI price estimation for display to user',
+            'required_fields': ['title', 'description', 'condition', 'uploaded_images (3-8 images)'],
+            'returns': 'Price estimation only - no database save',
+            'frontend_action': 'Show price to user, store item data in state'
+        },
+        'step_2': {
+            'endpoint': 'POST /api/submissions/',
+            'purpose': 'Submit complete data (item + contact) together',
+            'required_fields': ['full_name', 'email', 'phone', 'pickup_address', 'pickup_date', 'privacy_policy_accepted', 'products'],
+            'returns': 'Submission confirmation with tracking ID',
+            'frontend_action': 'Send all data together after user provides contact info'
+        },
+        'flow_benefits': ['No complex tokens', 'No cache expiration', 'Simple state management', 'User can review price before committing']
+    },
+    'submissions_api_help': {
+        'endpoint': 'POST /api/submissions/',
+        'authentication': '❌ NO AUTHENTICATION REQUIRED',
+        'method': 'POST',
+        'content_type': 'application/json',
+        'required_fields': {
+            'full_name': 'string - Customer full name',
+            'email': 'string - Customer email address',
+            'phone': 'string - Customer phone number',
+            'pickup_date': 'string - Future date in ISO format (2025-12-30T14:00:00Z)',
+            'pickup_address': 'string - Complete pickup address',
+            'privacy_policy_accepted': 'boolean - Must be true',
+            'products': 'array - Array of product objects'
+        },
+        'product_fields': {
+            'title': 'string - Product title (min 5 chars)',
+            'description': 'string - Product description (min 10 chars)',
+            'condition': 'string - EXCELLENT, GOOD, FAIR, or POOR',
+            'defects': 'string - Description of defects or "None"',
+            'uploaded_images': 'array - 1-8 base64 encoded images (data:image/jpeg;base64,...)'
+        },
+        'example_request': {
+            'full_name': 'John Smith',
+            'email': 'john@example.com',
+            'phone': '+1234567890',
+            'pickup_date': '2025-12-30T14:00:00Z',
+            'pickup_address': '123 Main St, City, State 12345',
+            'privacy_policy_accepted': True,
+            'products': [
+                {
+                    'title': 'iPhone 14 Pro 256GB',
+                    'description': 'Excellent condition iPhone with all accessories',
+                    'condition': 'EXCELLENT',
+                    'defects': 'Minor scratches on back case',
+                    'uploaded_images': ['data:image/jpeg;base64,/9j/4AAQ...']
+                }
+            ]
+        }
+    }
+}
+
+
+# Encoded once; matches DRF's JSONRenderer output (compact, UTF-8)
+API_ROOT_JSON = json.dumps(API_ROOT_DATA, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+@cache_control(max_age=3600, public=True)
 @api_view(['GET'])
 @permission_classes([])
 def api_root(request):
     """
     API Root endpoint - provides available endpoints information
     """
-    return Response({
-        'message': 'Auto Market API',
-        'version': '1.0',
-        'authentication_required': False,
-        'endpoints': {
-            # Two-step submission flow
-            'item_estimate': '/api/items/estimate/',  # Step 1: Get price estimation
-            'submissions': '/api/submissions/',        # Step 2: Submit with contact info
-            
-            # Other endpoints
-            'products': '/api/products/',
-            'ai_price_estimate': '/api/ai/price-estimate/',
-            'ai_detect_category': '/api/ai/detect-category/',
-            'ai_market_insights': '/api/ai/market-insights/',
-            'dashboard': '/api/dashboard/',
-            'admin': '/api/admin/'
-        },
-        'two_step_submission_flow': {
-            'description': 'Optimized for frontend state management',
-            'step_1': {
-                'endpoint': 'POST /api/items/estimate/',
-                'purpose': 'Get AI price estimation for display to user',
-                'required_fields': ['title', 'description', 'condition', 'uploaded_images (3-8 images)'],
-                'returns': 'Price estimation only - no database save',
-                'frontend_action': 'Show price to user, store item data in state'
-            },
-            'step_2': {
-                'endpoint': 'POST /api/submissions/',
-                'purpose': 'Submit complete data (item + contact) together',
-                'required_fields': ['full_name', 'email', 'phone', 'pickup_address', 'pickup_date', 'privacy_policy_accepted', 'products'],
-                'returns': 'Submission confirmation with tracking ID',
-                'frontend_action': 'Send all data together after user provides contact info'
-            },
-            'flow_benefits': ['No complex tokens', 'No cache expiration', 'Simple state management', 'User can review price before committing']
-        },
-        'submissions_api_help': {
-            'endpoint': 'POST /api/submissions/',
-            'authentication': '❌ NO AUTHENTICATION REQUIRED',
-            'method': 'POST',
-            'content_type': 'application/json',
-            'required_fields': {
-                'full_name': 'string - Customer full name',
-                'email': 'string - Customer email address',
-                'phone': 'string - Customer phone number',
-                'pickup_date': 'string - Future date in ISO format (2025-12-30T14:00:00Z)',
-                'pickup_address': 'string - Complete pickup address',
-                'privacy_policy_accepted': 'boolean - Must be true',
-                'products': 'array - Array of product objects'
-            },
-            'product_fields': {
-                'title': 'string - Product title (min 5 chars)',
-                'description': 'string - Product description (min 10 chars)',
-                'condition': 'string - EXCELLENT, GOOD, FAIR, or POOR',
-                'defects': 'string - Description of defects or "None"',
-                'uploaded_images': 'array - 1-8 base64 encoded images (data:image/jpeg;base64,...)'
-            },
-            'example_request': {
-                'full_name': 'John Smith',
-                'email': 'john@example.com',
-                'phone': '+1234567890',
-                'pickup_date': '2025-12-30T14:00:00Z',
-                'pickup_address': '123 Main St, City, State 12345',
-                'privacy_policy_accepted': True,
-                'products': [
-                    {
-                        'title': 'iPhone 14 Pro 256GB',
-                        'description': 'Excellent condition iPhone with all accessories',
-                        'condition': 'EXCELLENT',
-                        'defects': 'Minor scratches on back case',
-                        'uploaded_images': ['data:image/jpeg;base64,/9j/4AAQ...']
-                    }
-                ]
-            }
-        }
-    })
+    return HttpResponse(API_ROOT_JSON, content_type='application/json')
 
 
 class SubmissionBatchCreateView(generics.CreateAPIView):
@@ -170,15 +234,17 @@ class SubmissionBatchListView(generics.ListAPIView):
     """
     serializer_class = SubmissionBatchListSerializer
     permission_classes = []
+    # Columns read by SubmissionBatchListSerializer; the totals come from products
+    list_fields = ('id', 'batch_status', 'full_name', 'email', 'pickup_date', 'created_at', 'updated_at')
 
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return SubmissionBatch.objects.filter(user=self.request.user).order_by('-created_at')
+            return SubmissionBatch.objects.filter(user=self.request.user).only(*self.list_fields).order_by('-created_at')
         else:
             # For anonymous users, require email parameter to view their submissions
             email = self.request.query_params.get('email')
             if email:
-                return SubmissionBatch.objects.filter(email=email, user__isnull=True).order_by('-created_at')
+                return SubmissionBatch.objects.filter(email=email, user__isnull=True).only(*self.list_fields).order_by('-created_at')
             return SubmissionBatch.objects.none()
 
 
@@ -211,14 +277,18 @@ def check_submission_status(request, batch_id):
             'error': 'Email parameter is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        batch = SubmissionBatch.objects.get(id=batch_id, email=email)
-        serializer = SubmissionBatchSerializer(batch)
-        return Response(serializer.data)
-    except SubmissionBatch.DoesNotExist:
+    # Primary-key lookup with email as a plain predicate; the prefetches only
+    # run when the batch exists
+    batch = SubmissionBatch.objects.prefetch_related(
+        'products', 'products__images'
+    ).filter(id=batch_id, email=email).first()
+    if batch is None:
         return Response({
             'error': 'Submission not found or email does not match'
         }, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = SubmissionBatchSerializer(batch)
+    return Response(serializer.data)
 
 
 class UserProductListView(generics.ListAPIView):
@@ -251,25 +321,45 @@ def user_dashboard(request):
     """
     user = request.user
     
-    # Get user's submission batches summary
+    # Get user's submission batches summary - one aggregate query per table
     batches = SubmissionBatch.objects.filter(user=user)
-    products = Product.objects.filter(user=user)
+    batch_stats = batches.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(batch_status='PENDING_REVIEW')),
+        approved=Count('id', filter=Q(batch_status='APPROVED')),
+    )
+    product_stats = Product.objects.filter(user=user).aggregate(
+        total=Count('id'),
+        listed=Count('id', filter=Q(listing_status='LISTED')),
+        sold=Count('id', filter=Q(listing_status__in=['EBAY_SOLD', 'AMAZON_SOLD'])),
+        earnings=Sum('sold_price'),
+    )
+    # Plain dicts for the summary rows - same fields as SubmissionBatchListSerializer,
+    # with the per-batch totals computed in SQL
+    recent_submissions = list(
+        batches.order_by('-created_at')
+        .annotate(
+            total_items=Count('products'),
+            total_estimated_value=Coalesce(
+                Sum('products__estimated_value'), Value(Decimal('0')),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+        .values(
+            'id', 'batch_status', 'full_name', 'email', 'pickup_date',
+            'total_items', 'total_estimated_value', 'created_at', 'updated_at'
+        )[:5]
+    )
     
     dashboard_data = {
-        'total_submissions': batches.count(),
-        'pending_submissions': batches.filter(batch_status='PENDING_REVIEW').count(),
-        'approved_submissions': batches.filter(batch_status='APPROVED').count(),
-        'total_products': products.count(),
-        'listed_products': products.filter(listing_status='LISTED').count(),
-        'sold_products': products.filter(
-            listing_status__in=['EBAY_SOLD', 'AMAZON_SOLD']
-        ).count(),
-        'total_earnings': sum(
-            p.sold_price for p in products.filter(sold_price__isnull=False)
-        ) or 0,
-        'recent_submissions': SubmissionBatchListSerializer(
-            batches.order_by('-created_at')[:5], many=True
-        ).data
+        'total_submissions': batch_stats['total'],
+        'pending_submissions': batch_stats['pending'],
+        'approved_submissions': batch_stats['approved'],
+        'total_products': product_stats['total'],
+        'listed_products': product_stats['listed'],
+        'sold_products': product_stats['sold'],
+        'total_earnings': product_stats['earnings'] or 0,
+        'recent_submissions': recent_submissions
     }
     
     return Response(dashboard_data)
@@ -293,7 +383,7 @@ def ai_price_estimate(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        ai_service = AutoMarketAIService()
+        ai_service = _get_ai()
         result = ai_service.estimate_price(
             item_name=product_name,
             description=f"Category: {category or 'Unknown'}, Brand: {brand or 'Unknown'}",
@@ -354,153 +444,112 @@ def item_price_estimate_with_images(request):
     Returns: item_id(s) and price estimation(s) for Step 2
     """
     try:
-        # Check if request contains multiple products or single product
-        if 'products' in request.data or 'items' in request.data:
-            # Handle multiple products
+        # Normalise both request shapes to a list of products; only validation
+        # errors and the response differ between them
+        single = 'products' not in request.data and 'items' not in request.data
+        if single:
+            products_data = [request.data]
+        else:
             products_data = request.data.get('products') or request.data.get('items', [])
             if not isinstance(products_data, list) or not products_data:
                 return Response({
                     'status': 'error',
                     'message': 'Products must be a non-empty array'
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
-            temp_product_ids = []
-            products_summary = []
-            total_estimated_value = 0
-            
-            for i, product_data in enumerate(products_data):
-                # Validate each product
-                serializer = TempProductSerializer(data=product_data, context={'request': request})
-                if not serializer.is_valid():
+        
+        # Validate every product before saving any of them
+        serializers_list = []
+        for i, product_data in enumerate(products_data):
+            serializer = TempProductSerializer(data=product_data, context={'request': request})
+            if not serializer.is_valid():
+                if single:
                     return Response({
                         'status': 'error',
-                        'message': f'Validation failed for product {i+1}: {product_data.get("title", "Unknown")}',
-                        'errors': serializer.errors,
-                        'product_index': i
+                        'message': 'Validation failed',
+                        'errors': serializer.errors
                     }, status=status.HTTP_400_BAD_REQUEST)
-
-                # Save temporary product
-                temp_product = serializer.save()
-                
-                # Get AI price estimation
-                ai_service = AutoMarketAIService()
-                
-                # Prepare product data for AI analysis
-                product_analysis_data = {
-                    'title': temp_product.title,
-                    'description': temp_product.description,
-                    'condition': temp_product.condition,
-                    'defects': temp_product.defects
-                }
-                
-                # Get image paths for AI analysis
-                image_paths = [img.image.path for img in temp_product.images.all()]
-                
-                # Get pricing analysis using new AI service
-                final_estimate = ai_service.estimate_price(
-                    item_name=temp_product.title,
-                    description=temp_product.description,
-                    condition=temp_product.condition,
-                    defects=temp_product.defects,
-                    images=image_paths,
-                    pickup_address=""
-                )
-                
-                # Update temporary product with AI estimates
-                temp_product.estimated_value = final_estimate.get('estimated_price', 0)
-                temp_product.min_price_range = final_estimate.get('price_range_min', 0)
-                temp_product.max_price_range = final_estimate.get('price_range_max', 0)
-                temp_product.confidence = final_estimate.get('confidence', 'MEDIUM')
-                temp_product.save()
-                
-                temp_product_ids.append(temp_product.id)
-                total_estimated_value += float(temp_product.estimated_value)
-                
-                products_summary.append({
-                    'temp_product_id': temp_product.id,
-                    'title': temp_product.title,
-                    'condition': temp_product.condition,
-                    'estimated_value': float(temp_product.estimated_value),
-                    'price_range': f"${temp_product.min_price_range} - ${temp_product.max_price_range}",
-                    'confidence_level': temp_product.confidence,
-                    'image_count': temp_product.images.count()
-                })
-            
-            return Response({
-                'status': 'success',
-                'message': f'{len(products_data)} items saved temporarily with price estimation',
-                'temp_product_ids': temp_product_ids,
-                'products_summary': {
-                    'total_products': len(products_data),
-                    'total_estimated_value': round(total_estimated_value, 2),
-                    'average_condition': 'GOOD',  # Calculate based on actual conditions
-                    'highest_value_item': max(products_summary, key=lambda x: x['estimated_value'])['title'] if products_summary else None,
-                    'processing_completed': True
-                },
-                'individual_products': products_summary,
-                'temp_storage': {
-                    'expires_at': temp_product.expires_at.isoformat() if temp_product else None,
-                    'expires_in_hours': 24,
-                    'storage_status': 'temporary'
-                },
-                'next_step': {
-                    'endpoint': '/api/submissions/contact-only/',
-                    'method': 'POST',
-                    'instruction': 'Use all temp_product_ids in Step 2 with contact information',
-                    'expires_in_hours': 24
-                }
-            }, status=status.HTTP_201_CREATED)
-        
-        else:
-            # Handle single product (existing logic)
-            serializer = TempProductSerializer(data=request.data, context={'request': request})
-            
-            if not serializer.is_valid():
                 return Response({
                     'status': 'error',
-                    'message': 'Validation failed',
-                    'errors': serializer.errors
+                    'message': f'Validation failed for product {i+1}: {product_data.get("title", "Unknown")}',
+                    'errors': serializer.errors,
+                    'product_index': i
                 }, status=status.HTTP_400_BAD_REQUEST)
-
-            # Save temporary product
-            temp_product = serializer.save()
-            
-            # Get AI price estimation
-            ai_service = AutoMarketAIService()
-            
-            # Prepare product data for AI analysis
-            product_data = {
-                'title': temp_product.title,
-                'description': temp_product.description,
-                'condition': temp_product.condition,
-                'defects': temp_product.defects
-            }
-            
-            # Get image paths for AI analysis
-            image_paths = [img.image.path for img in temp_product.images.all()]
-            
-            # Get pricing analysis using the existing estimate_price method
-            final_estimate = ai_service.estimate_price(
+            serializers_list.append(serializer)
+
+        # Save temporary products in one transaction
+        with transaction.atomic():
+            temp_products = [serializer.save() for serializer in serializers_list]
+        # One query for every product's images; .images.all() below reads the cache
+        prefetch_related_objects(temp_products, 'images')
+
+        # Get AI price estimations - the calls are network bound, so run
+        # them concurrently instead of one after another. Images are
+        # resolved here so the worker threads never touch the database.
+        ai_service = _get_ai()
+        image_paths = [_ai_images(temp_product) for temp_product in temp_products]
+
+        def estimate(temp_product, paths):
+            return ai_service.estimate_price(
                 item_name=temp_product.title,
                 description=temp_product.description,
                 condition=temp_product.condition,
                 defects=temp_product.defects,
-                images=image_paths,
+                images=paths,
                 pickup_address=""
             )
-            
+
+        if len(temp_products) == 1:
+            estimates = [estimate(temp_products[0], image_paths[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(AI_ESTIMATE_WORKERS, len(temp_products))) as executor:
+                estimates = list(executor.map(estimate, temp_products, image_paths))
+
+        temp_product_ids = []
+        products_summary = []
+        total_estimated_value = 0
+        highest_value_item = None
+        highest_value = None
+
+        for temp_product, final_estimate in zip(temp_products, estimates):
             # Update temporary product with AI estimates
             temp_product.estimated_value = final_estimate.get('estimated_price', 0)
             temp_product.min_price_range = final_estimate.get('price_range_min', 0)
             temp_product.max_price_range = final_estimate.get('price_range_max', 0)
             temp_product.confidence = final_estimate.get('confidence', 'MEDIUM')
-            temp_product.save()
+
+            estimated_value = float(temp_product.estimated_value)
+            temp_product_ids.append(temp_product.id)
+            total_estimated_value += estimated_value
+            # Track the most valuable item as we go (first one wins ties)
+            if highest_value is None or estimated_value > highest_value:
+                highest_value = estimated_value
+                highest_value_item = temp_product.title
+
+            products_summary.append({
+                'temp_product_id': temp_product.id,
+                'title': temp_product.title,
+                'condition': temp_product.condition,
+                'estimated_value': estimated_value,
+                'price_range': f"${temp_product.min_price_range} - ${temp_product.max_price_range}",
+                'confidence_level': temp_product.confidence,
+                'image_count': len(temp_product.images.all())
+            })
+
+        TempProduct.objects.bulk_update(
+            temp_products,
+            ['estimated_value', 'min_price_range', 'max_price_range', 'confidence']
+        )
+        
+        if single:
+            temp_product = temp_products[0]
+            # Converted once in the loop above
+            estimated_value = products_summary[0]['estimated_value']
             
             # For backward compatibility, create image_analysis from the final estimate
             image_analysis = {
                 'condition_assessment': temp_product.condition,
                 'confidence_level': temp_product.confidence,
-                'estimated_value': float(temp_product.estimated_value)
+                'estimated_value': estimated_value
             }
             
             response_data = {
@@ -513,10 +562,10 @@ def item_price_estimate_with_images(request):
                     'description': temp_product.description,
                     'condition': temp_product.condition,
                     'defects': temp_product.defects,
-                    'image_count': temp_product.images.count()
+                    'image_count': products_summary[0]['image_count']
                 },
                 'pricing_estimate': {
-                    'estimated_value': float(temp_product.estimated_value),
+                    'estimated_value': estimated_value,
                     'min_price_range': float(temp_product.min_price_range),
                     'max_price_range': float(temp_product.max_price_range),
                     'confidence': temp_product.confidence
@@ -537,6 +586,30 @@ def item_price_estimate_with_images(request):
             
             return Response(response_data, status=status.HTTP_201_CREATED)
         
+        return Response({
+            'status': 'success',
+            'message': f'{len(products_data)} items saved temporarily with price estimation',
+            'temp_product_ids': temp_product_ids,
+            'products_summary': {
+                'total_products': len(products_data),
+                'total_estimated_value': round(total_estimated_value, 2),
+                'average_condition': 'GOOD',  # Calculate based on actual conditions
+                'highest_value_item': highest_value_item,
+                'processing_completed': True
+            },
+            'individual_products': products_summary,
+            'temp_storage': {
+                'expires_at': temp_product.expires_at.isoformat() if temp_product else None,
+                'expires_in_hours': 24,
+                'storage_status': 'temporary'
+            },
+            'next_step': {
+                'endpoint': '/api/submissions/contact-only/',
+                'method': 'POST',
+                'instruction': 'Use all temp_product_ids in Step 2 with contact information',
+                'expires_in_hours': 24
+            }
+        }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
         return Response({
@@ -562,8 +635,8 @@ def ai_detect_category(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        ai_service = AutoMarketAIService()
-        result = ai_service.detect_category(
+        result = _cached_ai_call(
+            'detect_category',
             product_name=product_name,
             description=description
         )
@@ -594,8 +667,8 @@ def ai_market_insights(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        ai_service = AutoMarketAIService()
-        result = ai_service.get_market_insights(
+        result = _cached_ai_call(
+            'get_market_insights',
             category=category,
             product_name=product_name,
         )
@@ -644,59 +717,28 @@ def contact_only_submission(request):
                 'errors': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create final submission batch
-        submission_batch = serializer.save()
-        
-        # Prepare email data
-        contact_info = {
-            'full_name': submission_batch.full_name,
-            'email': submission_batch.email,
-            'phone': submission_batch.phone,
-            'pickup_date': submission_batch.pickup_date.isoformat(),
-            'pickup_address': submission_batch.pickup_address,
-            'privacy_policy_accepted': submission_batch.privacy_policy_accepted
-        }
-        
-        # Get submitted items data for email
-        submitted_items = []
-        for product in submission_batch.products.all():
-            submitted_items.append({
-                'title': product.title,
-                'description': product.description,
-                'estimated_value': float(product.estimated_value),
-                'condition': product.condition,
-                'confidence': product.confidence,
-                'defects': product.defects or 'None'
-            })
-        
-        # Send confirmation emails (customer + admin) via Resend
-        email_results = {'customer_email': None, 'admin_email': None}
-        try:
-            from .email_services import send_item_submission_emails
-            
-            email_results = send_item_submission_emails(
-                user_email=submission_batch.email,
-                user_name=submission_batch.full_name,
-                submitted_items=submitted_items,
-                contact_info=contact_info
-            )
+        # Create final submission batch - one commit for the batch, its
+        # products and images
+        with transaction.atomic():
+            submission_batch = serializer.save()
             
-            logger.info(f"Emails sent for submission {submission_batch.id}: {email_results}")
-            
-        except Exception as email_error:
-            logger.error(f"Email sending failed for submission {submission_batch.id}: {str(email_error)}")
-            # Don't fail the submission if email fails
-        
-        # Return complete submission data
+            # Send confirmation emails (customer + admin) in the background once
+            # the submission is committed - don't make the client wait on Resend
+            batch_id = submission_batch.id
+            transaction.on_commit(lambda: queue_submission_emails(batch_id))
+        
+        # Return complete submission data - load products and their images in
+        # two queries; the serializer and the summary totals read this cache
+        prefetch_related_objects([submission_batch], 'products', 'products__images')
         batch_serializer = SubmissionBatchSerializer(submission_batch)
         
         response_data = {
             'status': 'success',
             'message': 'Submission completed successfully',
-            'submission_id': submission_batch.id,
+            'submission_id': batch_id,
             'submission_data': batch_serializer.data,
             'summary': {
-                'batch_id': submission_batch.id,
+                'batch_id': batch_id,
                 'contact_name': submission_batch.full_name,
                 'email': submission_batch.email,
                 'total_items': submission_batch.total_items,
@@ -706,15 +748,12 @@ def contact_only_submission(request):
                 'created_at': submission_batch.created_at.isoformat()
             },
             'email_status': {
-                'customer_email_sent': email_results.get('customer_email', {}).get('success', False),
-                'admin_email_sent': email_results.get('admin_email', {}).get('success', False),
-                'customer_email_error': email_results.get('customer_email', {}).get('error'),
-                'admin_email_error': email_results.get('admin_email', {}).get('error')
+                'queued': True
             },
             'next_steps': {
                 'admin_review': 'Your submission is pending admin review',
                 'notification': 'You will receive email updates on the status',
-                'tracking': f'Reference ID: {submission_batch.id}',
+                'tracking': f'Reference ID: {batch_id}',
                 'email_confirmation': 'Check your email for submission confirmation'
             }
         }
@@ -742,6 +781,48 @@ def api_test(request):
     })
 
 
+# Upper bound on concurrent file unlinks when cancelling temp products
+FILE_DELETE_WORKERS = 16
+# Temp products deleted per transaction in cancel_temp_items
+TEMP_DELETE_CHUNK_SIZE = 500
+
+
+def _remove_file(path):
+    """Delete a file, returning whether it was removed"""
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.error(f"Error deleting image {path}: {str(e)}")
+        return False
+
+
+def _delete_temp_products(ids):
+    """
+    Delete the temp products with the given ids and their image rows,
+    returning the number of products deleted.
+
+    The FK cascade is emulated by Django, which loads every row before
+    deleting it. With no delete signal receivers there is nothing to run
+    per row, so delete the image rows and then the products with one
+    statement each instead.
+    """
+    temp_products = TempProduct.objects.filter(pk__in=ids)
+    with transaction.atomic():
+        if any(
+            signal.has_listeners(model)
+            for signal in (pre_delete, post_delete)
+            for model in (TempProduct, TempProductImage)
+        ):
+            _, deleted_per_model = temp_products.delete()
+            return deleted_per_model.get(TempProduct._meta.label, 0)
+        
+        TempProductImage.objects.filter(temp_product_id__in=ids)._raw_delete(temp_products.db)
+        return temp_products._raw_delete(temp_products.db)
+
+
 @api_view(['POST'])
 @permission_classes([])
 def cancel_temp_items(request):
@@ -759,8 +840,17 @@ def cancel_temp_items(request):
     If no payload provided, deletes all expired temp products
     """
     try:
-        user_id = request.data.get('user_id')
-        temp_product_ids = request.data.get('temp_product_ids', [])
+        # Reject malformed ids before any query runs
+        serializer = CancelTempItemsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'status': 'error',
+                'message': 'Validation failed',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        user_id = serializer.validated_data.get('user_id')
+        temp_product_ids = serializer.validated_data.get('temp_product_ids', [])
         
         deleted_products = 0
         deleted_images = 0
@@ -780,7 +870,29 @@ def cancel_temp_items(request):
             temp_products = TempProduct.objects.filter(expires_at__lt=timezone.now())
             action = "all expired temp products"
         
-        if not temp_products.exists():
+        # Work through the matches in pages so a large expiry sweep never
+        # holds every row in memory; each page is removed and the query
+        # re-run until nothing matches. An empty first page means there
+        # was nothing to cancel.
+        while True:
+            ids = list(temp_products.values_list('pk', flat=True)[:TEMP_DELETE_CHUNK_SIZE])
+            if not ids:
+                break
+            
+            # Delete associated image files - one query per page for the
+            # paths, unlinks run in parallel
+            image_names = TempProductImage.objects.filter(
+                temp_product_id__in=ids
+            ).values_list('image', flat=True)
+            image_paths = [default_storage.path(name) for name in image_names if name]
+            if image_paths:
+                with ThreadPoolExecutor(max_workers=min(FILE_DELETE_WORKERS, len(image_paths))) as executor:
+                    deleted_images += sum(executor.map(_remove_file, image_paths))
+            
+            # Delete the page of temp products and their TempProductImage records
+            deleted_products += _delete_temp_products(ids)
+        
+        if not deleted_products:
             return Response({
                 'status': 'success',
                 'message': f'No temp products found to cancel ({action})',
@@ -788,22 +900,6 @@ def cancel_temp_items(request):
                 'deleted_images': 0
             }, status=status.HTTP_200_OK)
         
-        # Delete images and products
-        for temp_product in temp_products:
-            # Delete associated image files
-            for img in temp_product.images.all():
-                if img.image and os.path.isfile(img.image.path):
-                    try:
-                        os.remove(img.image.path)
-                        deleted_images += 1
-                    except Exception as e:
-                        logger.error(f"Error deleting image {img.image.path}: {str(e)}")
-            
-            deleted_products += 1
-        
-        # Delete all temp products (CASCADE will delete TempProductImage records)
-        temp_products.delete()
-        
         logger.info(f"Manual temp product cleanup: {deleted_products} products, {deleted_images} images deleted")
         
         return Response({
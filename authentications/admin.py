@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import Permission
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import CustomUser, UserProfile, OTP, RequestService, Review, Contact
+from .models import CustomUser, UserProfile, OTP, RequestService, Review, Contact, EmailOutbox
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -38,7 +39,8 @@ class CustomUserAdmin(UserAdmin):
     
     search_fields = ('email', 'full_name')
     ordering = ('email',)
-    filter_horizontal = ('groups', 'user_permissions',)
+    # Groups and permissions are searched on demand instead of rendering every row
+    autocomplete_fields = ('groups', 'user_permissions')
 
     def save_model(self, request, obj, form, change):
         """Ensure password is properly hashed when saving through admin"""
@@ -50,12 +52,28 @@ class CustomUserAdmin(UserAdmin):
 # Register CustomUser with proper admin
 admin.site.register(CustomUser, CustomUserAdmin)
 
+
+@admin.register(Permission)
+class PermissionAdmin(admin.ModelAdmin):
+    """Backs the user_permissions autocomplete; hidden from the admin index"""
+    search_fields = ('name', 'codename', 'content_type__app_label')
+
+    def get_queryset(self, request):
+        # Permission.__str__ reads the content type
+        return super().get_queryset(request).select_related('content_type')
+
+    def has_module_permission(self, request):
+        return False
+
 # Register other models
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'get_full_name', 'phone_number')
     search_fields = ('user__email', 'user__full_name', 'phone_number', 'address')
     list_filter = ('joined_date',)
+    # user is nullable, so the changelist won't join it on its own
+    list_select_related = ('user',)
+    list_per_page = 50
     fieldsets = (
         ('User Information', {
             'fields': ('user',)
@@ -133,4 +151,13 @@ class ContactAdmin(admin.ModelAdmin):
         ('Message Details', {
             'fields': ('your_message', 'created_at')
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('description', 'to', 'subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('to', 'subject')
+    readonly_fields = ('created_at', 'updated_at', 'sent_at', 'attempts', 'last_error')
+    list_per_page = 50
@@ -0,0 +1,36 @@
+"""
+Django management command to deliver pending EmailOutbox rows
+Run it from cron (or schedule flush_outbox_task with Celery beat) to retry
+emails whose background send failed or never ran
+"""
+from django.core.management.base import BaseCommand
+from authentications.tasks import flush_outbox, purge_outbox
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send pending emails from the outbox and purge old sent ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=7,
+            help='Delete sent emails older than this many days; 0 keeps them (default: 7)'
+        )
+
+    def handle(self, *args, **options):
+        sent, unsent = flush_outbox()
+        self.stdout.write(f'📧 Sent {sent} pending emails')
+        if unsent:
+            self.stdout.write(self.style.WARNING(f'⚠️  {unsent} emails could not be sent'))
+
+        purged = 0
+        if options['purge_days'] > 0:
+            purged = purge_outbox(options['purge_days'])
+            self.stdout.write(f'🗑️  Purged {purged} sent emails')
+
+        logger.info(f'Email outbox flush: {sent} sent, {unsent} unsent, {purged} purged')
+        self.stdout.write(self.style.SUCCESS('✅ Outbox flush complete'))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-16 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentications', '0002_contact_requestservice_review'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(fields=['email', '-created_at'], name='otp_email_created_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-16 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentications', '0003_otp_email_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['-created_at'], name='contact_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestservice',
+            index=models.Index(fields=['-created_at'], name='reqservice_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestservice',
+            index=models.Index(fields=['state', '-created_at'], name='reqservice_state_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestservice',
+            index=models.Index(fields=['service_type', '-created_at'], name='reqservice_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-created_at'], name='review_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['rating', '-created_at'], name='review_rating_created_idx'),
+        ),
+    ]
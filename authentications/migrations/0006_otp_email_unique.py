@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-16 04:17
+
+from django.db import migrations, models
+
+
+def keep_newest_otp_per_email(apps, schema_editor):
+    """Drop all but the newest OTP for each address before email becomes unique"""
+    OTP = apps.get_model('authentications', 'OTP')
+    seen = set()
+    stale = []
+    for pk, email in OTP.objects.order_by('email', '-created_at', '-pk').values_list('pk', 'email'):
+        if email in seen:
+            stale.append(pk)
+        else:
+            seen.add(email)
+    if stale:
+        OTP.objects.filter(pk__in=stale).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentications', '0005_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_newest_otp_per_email, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='otp',
+            name='otp_email_created_idx',
+        ),
+        migrations.AlterField(
+            model_name='otp',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+    ]
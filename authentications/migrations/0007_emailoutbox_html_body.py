@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentications', '0006_otp_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='html_body',
+            field=models.TextField(blank=True, help_text='Optional HTML alternative to the body'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 import os
 
@@ -67,7 +67,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         return f"{self.full_name} ({self.email})"
 
 class OTP(models.Model):
-    email = models.EmailField()
+    # One live code per address; issuing a new one overwrites the row
+    email = models.EmailField(unique=True)
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
     attempts = models.IntegerField(default=0)
@@ -75,10 +76,6 @@ class OTP(models.Model):
     def __str__(self):
         return f'OTP for {self.email}: {self.otp}'
 
-    def save(self, *args, **kwargs):
-        # No need to delete here as it's handled in create_otp view
-        super().save(*args, **kwargs)
-
     def is_expired(self):
         from django.utils import timezone
         time_diff = timezone.now() - self.created_at
@@ -105,6 +102,14 @@ class UserProfile(models.Model):
         return "No User"
 
 
+# Every user gets a profile when the account is created (signup, admin or
+# createsuperuser), so views can rely on user.user_profile
+@receiver(post_save, sender=CustomUser)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserProfile.objects.create(user=instance)
+
+
 # Signal to clean up profile picture when UserProfile is deleted
 @receiver(post_delete, sender=UserProfile)
 def delete_profile_picture(sender, instance, **kwargs):
@@ -115,80 +120,43 @@ def delete_profile_picture(sender, instance, **kwargs):
 
 
 # State choices for US states
-STATE_CHOICES = [
-    ('Alabama', 'Alabama'),
-    ('Alaska', 'Alaska'),
-    ('Arizona', 'Arizona'),
-    ('Arkansas', 'Arkansas'),
-    ('California', 'California'),
-    ('Colorado', 'Colorado'),
-    ('Connecticut', 'Connecticut'),
-    ('Delaware', 'Delaware'),
-    ('Florida', 'Florida'),
-    ('Georgia', 'Georgia'),
-    ('Hawaii', 'Hawaii'),
-    ('Idaho', 'Idaho'),
-    ('Illinois', 'Illinois'),
-    ('Indiana', 'Indiana'),
-    ('Iowa', 'Iowa'),
-    ('Kansas', 'Kansas'),
-    ('Kentucky', 'Kentucky'),
-    ('Louisiana', 'Louisiana'),
-    ('Maine', 'Maine'),
-    ('Maryland', 'Maryland'),
-    ('Massachusetts', 'Massachusetts'),
-    ('Michigan', 'Michigan'),
-    ('Minnesota', 'Minnesota'),
-    ('Mississippi', 'Mississippi'),
-    ('Missouri', 'Missouri'),
-    ('Montana', 'Montana'),
-    ('Nebraska', 'Nebraska'),
-    ('Nevada', 'Nevada'),
-    ('New Hampshire', 'New Hampshire'),
-    ('New Jersey', 'New Jersey'),
-    ('New Mexico', 'New Mexico'),
-    ('New York', 'New York'),
-    ('North Carolina', 'North Carolina'),
-    ('North Dakota', 'North Dakota'),
-    ('Ohio', 'Ohio'),
-    ('Oklahoma', 'Oklahoma'),
-    ('Oregon', 'Oregon'),
-    ('Pennsylvania', 'Pennsylvania'),
-    ('Rhode Island', 'Rhode Island'),
-    ('South Carolina', 'South Carolina'),
-    ('South Dakota', 'South Dakota'),
-    ('Tennessee', 'Tennessee'),
-    ('Texas', 'Texas'),
-    ('Utah', 'Utah'),
-    ('Vermont', 'Vermont'),
-    ('Virginia', 'Virginia'),
-    ('Washington', 'Washington'),
-    ('West Virginia', 'West Virginia'),
-    ('Wisconsin', 'Wisconsin'),
-    ('Wyoming', 'Wyoming'),
-]
-
-SERVICE_TYPE_CHOICES = [
-    ('Item Pickup & Sale', 'Item Pickup & Sale'),
-    ('Item Evaluation Only', 'Item Evaluation Only'),
-    ('Selling Consultation', 'Selling Consultation'),
-    ('Bulk Item Sale', 'Bulk Item Sale'),
-]
-
-ESTIMATED_VALUE_CHOICES = [
-    ('Under $500', 'Under $500'),
-    ('$500 - $1,000', '$500 - $1,000'),
-    ('$1,000 - $2,500', '$1,000 - $2,500'),
-    ('$2,500 - $5,000', '$2,500 - $5,000'),
-    ('Over $5,000', 'Over $5,000'),
-]
-
-TIMEFRAME_CHOICES = [
-    ('As soon as possible', 'As soon as possible'),
-    ('Within a week', 'Within a week'),
-    ('Within a month', 'Within a month'),
-    ("I'm flexible", "I'm flexible"),
-]
+_STATES = (
+    'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California',
+    'Colorado', 'Connecticut', 'Delaware', 'Florida', 'Georgia',
+    'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa',
+    'Kansas', 'Kentucky', 'Louisiana', 'Maine', 'Maryland',
+    'Massachusetts', 'Michigan', 'Minnesota', 'Mississippi', 'Missouri',
+    'Montana', 'Nebraska', 'Nevada', 'New Hampshire', 'New Jersey',
+    'New Mexico', 'New York', 'North Carolina', 'North Dakota', 'Ohio',
+    'Oklahoma', 'Oregon', 'Pennsylvania', 'Rhode Island', 'South Carolina',
+    'South Dakota', 'Tennessee', 'Texas', 'Utah', 'Vermont',
+    'Virginia', 'Washington', 'West Virginia', 'Wisconsin', 'Wyoming',
+)
+
+# Value and label are the same for these; lists keep the migration state unchanged
+STATE_CHOICES = [(state, state) for state in _STATES]
+
+SERVICE_TYPE_CHOICES = [(choice, choice) for choice in (
+    'Item Pickup & Sale',
+    'Item Evaluation Only',
+    'Selling Consultation',
+    'Bulk Item Sale',
+)]
+
+ESTIMATED_VALUE_CHOICES = [(choice, choice) for choice in (
+    'Under $500',
+    '$500 - $1,000',
+    '$1,000 - $2,500',
+    '$2,500 - $5,000',
+    'Over $5,000',
+)]
+
+TIMEFRAME_CHOICES = [(choice, choice) for choice in (
+    'As soon as possible',
+    'Within a week',
+    'Within a month',
+    "I'm flexible",
+)]
 
 RATING_CHOICES = [
     (1, '1 Star'),
@@ -218,6 +186,12 @@ class RequestService(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Match the default ordering and the admin's list filters
+        indexes = [
+            models.Index(fields=['-created_at'], name='reqservice_created_idx'),
+            models.Index(fields=['state', '-created_at'], name='reqservice_state_created_idx'),
+            models.Index(fields=['service_type', '-created_at'], name='reqservice_type_created_idx'),
+        ]
 
 
 class Review(models.Model):
@@ -232,6 +206,10 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='review_created_idx'),
+            models.Index(fields=['rating', '-created_at'], name='review_rating_created_idx'),
+        ]
 
 
 class Contact(models.Model):
@@ -244,4 +222,46 @@ class Contact(models.Model):
         return f"Contact from {self.your_name}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['-created_at'], name='contact_created_idx')]
+
+class EmailOutbox(models.Model):
+    """
+    Outgoing email, written in the same transaction as whatever triggered it.
+    Delivered after commit (see tasks.py); rows left pending are retried by
+    the flush_email_outbox command.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUSES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    from_email = models.CharField(max_length=255)
+    to = models.TextField(help_text='Comma-separated recipient addresses')
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, help_text='Optional HTML alternative to the body')
+    description = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.description or 'Email'} to {self.to} ({self.status})"
+
+    @property
+    def recipient_list(self):
+        return [address for address in self.to.split(',') if address]
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'], name='outbox_status_created_idx')]
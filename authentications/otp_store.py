@@ -0,0 +1,115 @@
+"""
+Short-lived OTP storage.
+
+With OTP_STORE = 'cache' the codes live in the Django cache (Redis when
+REDIS_URL is configured) under otp:<email>, so issuing and checking a code
+never touches the database. The 'db' store keeps using the OTP table and is
+the default when no shared cache is available, since a per-process locmem
+cache would lose codes between workers.
+"""
+
+import hmac
+import time
+from collections import namedtuple
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from .models import OTP
+
+# OTP expires after 5 minutes (300 seconds)
+OTP_TTL = 300
+
+# Cache entries outlive the TTL a little so an expired code is reported as
+# expired rather than missing
+OTP_CACHE_GRACE = 300
+
+
+class OTPNotFound(LookupError):
+    pass
+
+
+class StoredOTP(namedtuple('StoredOTP', 'email otp issued_at')):
+    __slots__ = ()
+
+    def is_expired(self):
+        return time.time() - self.issued_at > OTP_TTL
+
+    def matches(self, value):
+        """
+        Constant-time check of a submitted code. Stored codes are always
+        clean 6-digit strings; only the submitted value is normalised.
+        """
+        return hmac.compare_digest(self.otp.encode(), str(value).strip().encode())
+
+
+def _use_cache():
+    return getattr(settings, 'OTP_STORE', 'db') == 'cache'
+
+
+def _key(email):
+    return f"otp:{email}"
+
+
+def store(email, otp):
+    """
+    Store a new code for email, replacing any previous one
+    """
+    if _use_cache():
+        cache.set(_key(email), (str(otp), time.time()), OTP_TTL + OTP_CACHE_GRACE)
+        return
+
+    # email is unique, so this is one INSERT ... ON CONFLICT (email) DO UPDATE
+    OTP.objects.bulk_create(
+        [OTP(email=email, otp=otp)],
+        update_conflicts=True,
+        unique_fields=['email'],
+        update_fields=['otp', 'created_at', 'attempts'],
+    )
+
+
+def get(email):
+    """
+    Return the current StoredOTP for email, or raise OTPNotFound
+    """
+    if _use_cache():
+        entry = cache.get(_key(email))
+        if entry is None:
+            raise OTPNotFound(email)
+        return StoredOTP(email, *entry)
+
+    otp_obj = OTP.objects.filter(email=email).first()
+    if otp_obj is None:
+        raise OTPNotFound(email)
+    return StoredOTP(email, otp_obj.otp, otp_obj.created_at.timestamp())
+
+
+def get_with_user(email):
+    """
+    Return (StoredOTP, user) for email, where user is None if no account
+    uses the address. Raises OTPNotFound like get().
+
+    With the 'db' store the OTP is read as subqueries on the user
+    lookup, so both come back in one round trip.
+    """
+    User = get_user_model()
+    if _use_cache():
+        return get(email), User.objects.filter(email=email).first()
+
+    latest = OTP.objects.filter(email=OuterRef('email'))
+    user = User.objects.filter(email=email).annotate(
+        stored_otp=Subquery(latest.values('otp')[:1]),
+        stored_otp_created_at=Subquery(latest.values('created_at')[:1]),
+    ).first()
+    if user is None:
+        return get(email), None
+    if user.stored_otp is None:
+        raise OTPNotFound(email)
+    return StoredOTP(email, user.stored_otp, user.stored_otp_created_at.timestamp()), user
+
+
+def delete(email):
+    if _use_cache():
+        cache.delete(_key(email))
+    else:
+        OTP.objects.filter(email=email).delete()
@@ -1,9 +1,44 @@
 from rest_framework import serializers
 from .models import CustomUser, OTP, UserProfile, RequestService, Review, Contact
 from django.contrib.auth import get_user_model, authenticate
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
 
 User = get_user_model()
 
+# With USER_CACHE on, serialized users are cached until the user or their
+# profile changes (see the invalidation receivers in signals.py)
+USER_CACHE_TIMEOUT = 300
+
+
+def user_cache_key(pk):
+    return f"user:{pk}:v1"
+
+
+class CachedUserListSerializer(serializers.ListSerializer):
+    """Reads every cached user in one round trip and stores the misses in one more"""
+
+    def to_representation(self, data):
+        if not self.child.is_cacheable():
+            return super().to_representation(data)
+
+        users = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        keys = [user_cache_key(user.pk) for user in users]
+        cached = cache.get_many(keys)
+        missing = {}
+        result = []
+        for key, user in zip(keys, users):
+            representation = cached.get(key)
+            if representation is None:
+                representation = missing[key] = self.child.to_representation_uncached(user)
+            result.append(representation)
+
+        if missing:
+            cache.set_many(missing, USER_CACHE_TIMEOUT)
+        return result
+
+
 class CustomUserSerializer(serializers.ModelSerializer):
     user_profile = serializers.SerializerMethodField()
 
@@ -11,13 +46,31 @@ class CustomUserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'email', 'full_name', 'role', 'is_verified', 'user_profile']
         read_only_fields = ['id', 'is_active', 'is_staff', 'is_superuser']
+        list_serializer_class = CachedUserListSerializer
+
+    def is_cacheable(self):
+        # Profile picture URLs take their host from the request when there is one
+        return getattr(settings, 'USER_CACHE', False) and 'request' not in self.context
+
+    def to_representation_uncached(self, instance):
+        return super().to_representation(instance)
+
+    def to_representation(self, instance):
+        if not self.is_cacheable():
+            return super().to_representation(instance)
+        return cache.get_or_set(
+            user_cache_key(instance.pk),
+            lambda: self.to_representation_uncached(instance),
+            USER_CACHE_TIMEOUT
+        )
 
     def get_user_profile(self, obj):
-        try:
-            profile = obj.user_profile
-            return UserProfileSerializer(profile, context=self.context).data
-        except UserProfile.DoesNotExist:
+        # Querysets should select_related('user_profile'); a missing profile
+        # raises RelatedObjectDoesNotExist, an AttributeError subclass
+        profile = getattr(obj, 'user_profile', None)
+        if profile is None:
             return None
+        return UserProfileSerializer(profile, context=self.context).data
 
 class CustomUserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, min_length=8)
@@ -54,9 +107,7 @@ class CustomUserCreateSerializer(serializers.ModelSerializer):
             if len(data['password']) < 8:
                 errors['password'] = ['Password must be at least 8 characters long']
         
-        # Email uniqueness validation
-        if data.get('email') and User.objects.filter(email=data['email'], is_verified=True).exists():
-            errors['email'] = ['A user with this email already exists']
+        # Email uniqueness is enforced by the unique index when the user is created
         
         # Role validation - only allow 'user' role for registration
         if data.get('role') and data.get('role') not in ['user']:
@@ -70,18 +121,24 @@ class CustomUserCreateSerializer(serializers.ModelSerializer):
         # Remove confirm_password as it's not needed for user creation
         validated_data.pop('confirm_password', None)
         
-        # Delete any unverified users with the same email
-        User.objects.filter(email=validated_data['email'], is_verified=False).delete()
-        
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=validated_data['password'],
-            full_name=validated_data['full_name'],
-            role=validated_data.get('role', 'user')
-        )
-        
-        # Create user profile
-        UserProfile.objects.create(user=user)
+        try:
+            with transaction.atomic():
+                # Delete any unverified users with the same email
+                User.objects.filter(email=validated_data['email'], is_verified=False).delete()
+                
+                user = User.objects.create_user(
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    full_name=validated_data['full_name'],
+                    role=validated_data.get('role', 'user')
+                )
+                # The profile is created by the post_save receiver in models.py
+        except IntegrityError:
+            # Only a clash on the email is the caller's fault; the transaction
+            # was rolled back, so any row found now belongs to another user
+            if User.objects.filter(email=validated_data['email']).exists():
+                raise serializers.ValidationError({'email': ['A user with this email already exists']})
+            raise
         return user
 
 class OTPSerializer(serializers.ModelSerializer):
@@ -114,15 +171,25 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'full_name', 'email', 'profile_picture', 'profile_picture_url', 'phone_number', 'address', 'joined_date']
         read_only_fields = ['id', 'user', 'full_name', 'email', 'joined_date', 'profile_picture_url']
 
-    def get_profile_picture_url(self, obj):
-        """Return full URL for profile picture"""
-        if obj.profile_picture:
+    def _url_prefix(self):
+        """Scheme and host for media URLs, worked out once per serializer"""
+        prefix = getattr(self, '_prefix', None)
+        if prefix is None:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.profile_picture.url)
+                prefix = request.build_absolute_uri('/')[:-1]
             else:
-                # Fallback when no request context
-                return f"http://10.10.12.15:8000{obj.profile_picture.url}"
+                # No request context: MEDIA_HOST, or a relative URL when it is empty
+                prefix = getattr(settings, 'MEDIA_HOST', '')
+            self._prefix = prefix
+        return prefix
+
+    def get_profile_picture_url(self, obj):
+        """Return full URL for profile picture"""
+        if obj.profile_picture:
+            url = obj.profile_picture.url
+            # Storages that already return absolute URLs are passed through
+            return f"{self._url_prefix()}{url}" if url.startswith('/') else url
         return None
 
     def to_representation(self, instance):
@@ -1,33 +1,40 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
+from django.core.cache import cache
 from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from string import Template
 import logging
+import re
 
-from .models import CustomUser, OTP, RequestService, Review, Contact
+from .models import CustomUser, UserProfile, RequestService, Review, Contact
+from .serializers import user_cache_key
+from .tasks import queue_mail
 
 logger = logging.getLogger(__name__)
 
-# =============================================================================
-# AUTHENTICATION EMAILS (TO USERS)
-# =============================================================================
+# Admin notifications (service requests, reviews, contact messages) can be
+# switched off, e.g. in dev/CI; the handlers then skip building the emails
+SEND_ADMIN_EMAILS = getattr(settings, 'SEND_ADMIN_EMAILS', True)
 
-@receiver(post_save, sender=CustomUser)
-def send_welcome_email(sender, instance, created, **kwargs):
-    """Send welcome email when user signs up via Resend"""
-    if created:
-        try:
-            subject = "Welcome to Auto Market! 🎉"
-            message = f"""
-Dear {instance.full_name},
+# Logging OTP codes is a development aid only; decided once at import
+OTP_DEBUG = settings.DEBUG and getattr(settings, 'OTP_CONSOLE_LOG', False)
+
+# OTPs for these (lowercase) domains are only logged, never emailed
+TEST_EMAIL_DOMAINS = frozenset({'example.com', 'test.com', 'testing.com'})
+
+# Email bodies are built once; each send is a single substitution
+WELCOME_EMAIL = Template("""
+Dear $full_name,
 
 Welcome to Auto Market! Your account has been successfully created.
 
 Account Details:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📧 Email: {instance.email}
-👤 Name: {instance.full_name}
-🎯 Role: {instance.get_role_display()}
+📧 Email: $email
+👤 Name: $full_name
+🎯 Role: $role
 ✅ Status: Active
 
 Getting Started:
@@ -57,36 +64,16 @@ The Auto Market Team
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 This email was sent via Resend API
 Auto Market - Your Marketplace Solution
-            """
-            
-            # Send TO USER via Resend
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email='noreply@bluberryhq.com',  # Use your verified domain
-                recipient_list=[instance.email],
-                fail_silently=False
-            )
-            
-            logger.info(f"Welcome email sent via Resend to {instance.email}")
-            
-        except Exception as e:
-            logger.error(f"Failed to send welcome email via Resend: {str(e)}")
+            """)
 
-@receiver(post_save, sender=OTP)
-def send_otp_email(sender, instance, created, **kwargs):
-    """Send OTP email for password reset via Resend"""
-    if created:
-        try:
-            subject = "Password Reset Code - Auto Market"
-            message = f"""
+OTP_EMAIL = Template("""
 Password Reset Request
 
 Hello,
 
 You requested to reset your password for your Auto Market account.
 
-Your verification code: {instance.otp}
+Your verification code: $otp
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🔒 Security Information:
@@ -99,7 +86,7 @@ Your verification code: {instance.otp}
 Instructions:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 1. Go to the password reset page
-2. Enter this OTP code: {instance.otp}
+2. Enter this OTP code: $otp
 3. Create your new password
 4. Login with your new credentials
 
@@ -111,57 +98,33 @@ Auto Market Security Team
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 This email was sent securely via Resend API
 Auto Market - Your Marketplace Solution
-            """
-            
-            # Send TO USER via Resend
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email='noreply@bluberryhq.com',  # Use your verified domain
-                recipient_list=[instance.email],
-                fail_silently=False
-            )
-            
-            logger.info(f"OTP email sent via Resend to {instance.email}")
-            
-        except Exception as e:
-            logger.error(f"Failed to send OTP email via Resend: {str(e)}")
+            """)
 
-# =============================================================================
-# FORM SUBMISSION EMAILS (TO ADMIN)
-# =============================================================================
-
-@receiver(post_save, sender=RequestService)
-def send_service_request_notification(sender, instance, created, **kwargs):
-    """Send service request data TO admin via Resend"""
-    if created:
-        try:
-            subject = f"🔔 New Service Request #{instance.id} - {instance.full_name}"
-            message = f"""
+SERVICE_REQUEST_EMAIL = Template("""
 NEW SERVICE REQUEST RECEIVED
 
 Customer Information:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-👤 Full Name: {instance.full_name}
-📧 Email: {instance.email}
-📱 Phone: {instance.phone_number}
-📍 Location: {instance.city}, {instance.state} {instance.zip_code}
+👤 Full Name: $full_name
+📧 Email: $email
+📱 Phone: $phone_number
+📍 Location: $city, $state $zip_code
 
 Service Details:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🔧 Service Type: {instance.service_type}
-📦 Items: {instance.types_of_items}
-💰 Estimated Value: {instance.estimated_total_value}
-⏰ Timeframe: {instance.preferred_timeframe}
+🔧 Service Type: $service_type
+📦 Items: $types_of_items
+💰 Estimated Value: $estimated_total_value
+⏰ Timeframe: $preferred_timeframe
 
 Additional Information:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-{instance.additional_information or '📝 No additional information provided'}
+$additional_information
 
 Request Details:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🆔 Request ID: #{instance.id}
-📅 Submitted: {instance.created_at.strftime('%B %d, %Y at %I:%M %p')}
+🆔 Request ID: #$id
+📅 Submitted: $submitted
 🌐 Platform: Auto Market
 
 ACTION REQUIRED:
@@ -174,120 +137,71 @@ ACTION REQUIRED:
 
 Quick Contact:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📧 Email: {instance.email}
-📱 Phone: {instance.phone_number}
+📧 Email: $email
+📱 Phone: $phone_number
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 This notification was sent via Resend API
 Auto Market - Service Request System
-            """
-            
-            # Send TO ADMIN via Resend (currently limited to verified email)
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email='onboarding@resend.dev',  # Use verified Resend domain
-                recipient_list=['alecgold808@gmail.com'],  # Resend verified email (for now)
-                fail_silently=False
-            )
-            
-            logger.info(f"Service request #{instance.id} notification sent via Resend to admin")
-            
-        except Exception as e:
-            logger.error(f"Failed to send service request notification via Resend: {str(e)}")
+            """)
 
-@receiver(post_save, sender=Review)
-def send_review_notification(sender, instance, created, **kwargs):
-    """Send review data TO admin via Resend"""
-    if created:
-        try:
-            stars = '⭐' * instance.rating
-            subject = f"⭐ New Review #{instance.id} - {instance.rating} Stars from {instance.your_name}"
-            message = f"""
+REVIEW_EMAIL = Template("""
 NEW CUSTOMER REVIEW RECEIVED
 
 Customer Information:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-👤 Name: {instance.your_name}
-📧 Email: {instance.email}
-🌟 Rating: {stars} ({instance.rating}/5 Stars)
+👤 Name: $your_name
+📧 Email: $email
+🌟 Rating: $stars ($rating/5 Stars)
 
 Review Content:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💬 "{instance.your_review}"
+💬 "$your_review"
 
 Review Analysis:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-{'🎉 Excellent feedback!' if instance.rating == 5 else 
- '👍 Great feedback!' if instance.rating == 4 else
- '👌 Good feedback' if instance.rating == 3 else
- '⚠️ Needs attention' if instance.rating == 2 else
- '🚨 Urgent attention required'}
+$analysis
 
 Review Details:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🆔 Review ID: #{instance.id}
-📅 Submitted: {instance.created_at.strftime('%B %d, %Y at %I:%M %p')}
+🆔 Review ID: #$id
+📅 Submitted: $submitted
 🌐 Platform: Auto Market
 
 RECOMMENDED ACTIONS:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-{'✅ Share on social media\n✅ Feature on website homepage\n✅ Thank customer personally\n✅ Request testimonial' if instance.rating >= 4 else
- '✅ Thank customer for feedback\n✅ Address any concerns\n✅ Follow up for improvement\n✅ Monitor service quality'}
+$actions
 
 Customer Contact:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📧 Email: {instance.email}
+📧 Email: $email
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 This notification was sent via Resend API
 Auto Market - Review Management System
-            """
-            
-            # Send TO ADMIN via Resend (currently limited to verified email)
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email='onboarding@resend.dev',  # Use verified Resend domain
-                recipient_list=['alecgold808@gmail.com'],  # Resend verified email (for now)
-                fail_silently=False
-            )
-            
-            logger.info(f"Review #{instance.id} notification sent via Resend to admin")
-            
-        except Exception as e:
-            logger.error(f"Failed to send review notification via Resend: {str(e)}")
+            """)
 
-@receiver(post_save, sender=Contact)
-def send_contact_notification(sender, instance, created, **kwargs):
-    """Send contact message data TO admin via Resend"""
-    if created:
-        try:
-            subject = f"📧 New Contact Message #{instance.id} from {instance.your_name}"
-            message = f"""
+CONTACT_EMAIL = Template("""
 NEW CONTACT MESSAGE RECEIVED
 
 Customer Information:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-👤 Name: {instance.your_name}
-📧 Email: {instance.your_email}
+👤 Name: $your_name
+📧 Email: $your_email
 
 Message Content:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💬 "{instance.your_message}"
+💬 "$your_message"
 
 Message Analysis:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📝 Length: {len(instance.your_message)} characters
-🏷️ Type: {'Question' if '?' in instance.your_message else
-         'Support Request' if any(word in instance.your_message.lower() for word in ['help', 'problem', 'issue', 'bug']) else
-         'Inquiry' if any(word in instance.your_message.lower() for word in ['price', 'cost', 'service', 'how']) else
-         'General Message'}
+📝 Length: $length characters
+🏷️ Type: $message_type
 
 Message Details:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🆔 Message ID: #{instance.id}
-📅 Submitted: {instance.created_at.strftime('%B %d, %Y at %I:%M %p')}
+🆔 Message ID: #$id
+📅 Submitted: $submitted
 🌐 Platform: Auto Market
 
 ACTION REQUIRED:
@@ -300,25 +214,277 @@ ACTION REQUIRED:
 
 Quick Actions:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📧 REPLY TO: {instance.your_email}
+📧 REPLY TO: $your_email
 📱 Call if urgent
 📝 Update CRM system
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 This notification was sent via Resend API
 Auto Market - Contact Management System
-            """
+            """)
+
+# Month names and AM/PM for format_submitted, same output as
+# strftime('%B %d, %Y at %I:%M %p') in the C locale
+MONTHS = ('', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December')
+
+
+def format_submitted(dt):
+    """e.g. 'January 02, 2026 at 03:04 PM'"""
+    return (f"{MONTHS[dt.month]} {dt.day:02d}, {dt.year} at "
+            f"{(dt.hour - 1) % 12 + 1:02d}:{dt.minute:02d} {'PM' if dt.hour >= 12 else 'AM'}")
+
+
+def format_timestamp(dt):
+    """e.g. '2026-01-02 15:04:05', like strftime('%Y-%m-%d %H:%M:%S')"""
+    # The first 19 characters of the ISO form, without fraction or UTC offset
+    return dt.isoformat(' ', 'seconds')[:19]
+
+RATING_ANALYSIS = {
+    5: '🎉 Excellent feedback!',
+    4: '👍 Great feedback!',
+    3: '👌 Good feedback',
+    2: '⚠️ Needs attention',
+    1: '🚨 Urgent attention required',
+}
+
+RATING_ACTIONS_POSITIVE = '✅ Share on social media\n✅ Feature on website homepage\n✅ Thank customer personally\n✅ Request testimonial'
+RATING_ACTIONS_OTHER = '✅ Thank customer for feedback\n✅ Address any concerns\n✅ Follow up for improvement\n✅ Monitor service quality'
+
+# Valid ratings are 1-5, so their per-rating strings are prebuilt and looked
+# up; anything else (the model doesn't enforce choices) is built as before
+STARS = {rating: '⭐' * rating for rating in RATING_ANALYSIS}
+RATING_ACTIONS = {
+    rating: RATING_ACTIONS_POSITIVE if rating >= 4 else RATING_ACTIONS_OTHER
+    for rating in RATING_ANALYSIS
+}
+
+SUPPORT_WORDS = ('help', 'problem', 'issue', 'bug')
+INQUIRY_WORDS = ('price', 'cost', 'service', 'how')
+
+# One case-insensitive scan per category instead of lowering the message and
+# searching it once per word
+SUPPORT_RE = re.compile('|'.join(map(re.escape, SUPPORT_WORDS)), re.IGNORECASE)
+INQUIRY_RE = re.compile('|'.join(map(re.escape, INQUIRY_WORDS)), re.IGNORECASE)
+
+
+def classify_contact_message(text):
+    """Rough message type shown in the admin notification"""
+    if '?' in text:
+        return 'Question'
+    if SUPPORT_RE.search(text):
+        return 'Support Request'
+    if INQUIRY_RE.search(text):
+        return 'Inquiry'
+    return 'General Message'
+
+# =============================================================================
+# AUTHENTICATION EMAILS (TO USERS)
+# =============================================================================
+
+@receiver(post_save, sender=CustomUser)
+def send_welcome_email(sender, instance, created, **kwargs):
+    """Send welcome email when user signs up via Resend"""
+    if created:
+        try:
+            subject = "Welcome to Auto Market! 🎉"
+            message = WELCOME_EMAIL.substitute(
+                full_name=instance.full_name,
+                email=instance.email,
+                role=instance.get_role_display()
+            )
             
-            # Send TO ADMIN via Resend (currently limited to verified email)
-            send_mail(
+            # Send TO USER via Resend - in the background, after the user is committed
+            queue_mail(
                 subject=subject,
                 message=message,
-                from_email='onboarding@resend.dev',  # Use verified Resend domain
-                recipient_list=['alecgold808@gmail.com'],  # Resend verified email (for now)
-                fail_silently=False
+                from_email='noreply@bluberryhq.com',  # Use your verified domain
+                recipient_list=[instance.email],
+                description="Welcome email"
             )
             
-            logger.info(f"Contact message #{instance.id} notification sent via Resend to admin")
+        except Exception as e:
+            logger.error(f"Failed to queue welcome email: {str(e)}")
+
+# The verification email only varies by two values, so the template is
+# rendered once with placeholders and each send substitutes the escaped values
+_OTP_PLACEHOLDER = '\x00otp\x00'
+_EMAIL_PLACEHOLDER = '\x00email\x00'
+_otp_email_shell = None
+
+def render_otp_email(email, otp):
+    global _otp_email_shell
+    if _otp_email_shell is None:
+        _otp_email_shell = render_to_string(
+            'otp_email_template.html',
+            {'otp': _OTP_PLACEHOLDER, 'email': _EMAIL_PLACEHOLDER}
+        )
+    return _otp_email_shell.replace(_OTP_PLACEHOLDER, escape(otp)).replace(_EMAIL_PLACEHOLDER, escape(email))
+
+def queue_otp_email(email, otp, password_reset=False):
+    """
+    Send an OTP email via Resend: the HTML verification email, or the
+    password reset text when password_reset is set.
+    Called directly when a code is issued - OTPs are not always model rows.
+    """
+    if OTP_DEBUG:
+        logger.debug("Sending OTP %s to %s", otp, email)
+
+    domain = email.rpartition('@')[2].lower()
+    if domain in TEST_EMAIL_DOMAINS:
+        logger.debug("Test email domain %s - OTP not emailed", domain)
+        return
+
+    try:
+        if password_reset:
+            subject = "Password Reset Code - Auto Market"
+            message = OTP_EMAIL.substitute(otp=otp)
+            html_message = None
+        else:
+            subject = "Your OTP Code - AutoMarket"
+            message = f"Your OTP verification code is: {otp}"
+            html_message = render_otp_email(email, otp)
+        
+        # Send TO USER via Resend - in the background, after the request commits
+        queue_mail(
+            subject=subject,
+            message=message,
+            from_email='noreply@bluberryhq.com',  # Use your verified domain
+            recipient_list=[email],
+            description="OTP email",
+            html_message=html_message
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to queue OTP email: {str(e)}")
+
+# =============================================================================
+# FORM SUBMISSION EMAILS (TO ADMIN)
+# =============================================================================
+
+def service_request_message(instance):
+    return SERVICE_REQUEST_EMAIL.substitute(
+        id=instance.id,
+        full_name=instance.full_name,
+        email=instance.email,
+        phone_number=instance.phone_number,
+        city=instance.city,
+        state=instance.state,
+        zip_code=instance.zip_code,
+        service_type=instance.service_type,
+        types_of_items=instance.types_of_items,
+        estimated_total_value=instance.estimated_total_value,
+        preferred_timeframe=instance.preferred_timeframe,
+        additional_information=instance.additional_information or '📝 No additional information provided',
+        submitted=format_submitted(instance.created_at)
+    )
+
+def review_message(instance):
+    return REVIEW_EMAIL.substitute(
+        id=instance.id,
+        your_name=instance.your_name,
+        email=instance.email,
+        stars=STARS.get(instance.rating) or '⭐' * instance.rating,
+        rating=instance.rating,
+        your_review=instance.your_review,
+        analysis=RATING_ANALYSIS.get(instance.rating, RATING_ANALYSIS[1]),
+        actions=RATING_ACTIONS.get(
+            instance.rating,
+            RATING_ACTIONS_POSITIVE if instance.rating >= 4 else RATING_ACTIONS_OTHER
+        ),
+        submitted=format_submitted(instance.created_at)
+    )
+
+def contact_message(instance):
+    return CONTACT_EMAIL.substitute(
+        id=instance.id,
+        your_name=instance.your_name,
+        your_email=instance.your_email,
+        your_message=instance.your_message,
+        length=len(instance.your_message),
+        message_type=classify_contact_message(instance.your_message),
+        submitted=format_submitted(instance.created_at)
+    )
+
+# Per model: (name used in descriptions and logs, subject builder, body builder)
+ADMIN_NOTIFICATIONS = {
+    RequestService: (
+        'Service request',
+        lambda instance: f"🔔 New Service Request #{instance.id} - {instance.full_name}",
+        service_request_message,
+    ),
+    Review: (
+        'Review',
+        lambda instance: f"⭐ New Review #{instance.id} - {instance.rating} Stars from {instance.your_name}",
+        review_message,
+    ),
+    Contact: (
+        'Contact',
+        lambda instance: f"📧 New Contact Message #{instance.id} from {instance.your_name}",
+        contact_message,
+    ),
+}
+
+def queue_admin_notification(subject, message, description):
+    # Send TO ADMIN via Resend (currently limited to verified email) -
+    # in the background, after the submission is committed
+    queue_mail(
+        subject=subject,
+        message=message,
+        from_email='onboarding@resend.dev',  # Use verified Resend domain
+        recipient_list=['alecgold808@gmail.com'],  # Resend verified email (for now)
+        description=description
+    )
+
+@receiver(post_save, sender=RequestService)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Contact)
+def send_admin_notification(sender, instance, created, **kwargs):
+    """Send new service request, review and contact data TO admin via Resend"""
+    if created and SEND_ADMIN_EMAILS:
+        name, build_subject, build_message = ADMIN_NOTIFICATIONS[sender]
+        try:
+            queue_admin_notification(
+                subject=build_subject(instance),
+                message=build_message(instance),
+                description=f"{name} notification #{instance.id}"
+            )
+            logger.info(f"{name} #{instance.id} notification queued for admin")
             
         except Exception as e:
-            logger.error(f"Failed to send contact notification via Resend: {str(e)}")
\ No newline at end of file
+            logger.error(f"Failed to queue {name.lower()} notification: {str(e)}")
+
+def queue_service_requests_notification(instances):
+    """
+    Send one admin email covering service requests saved with bulk_create,
+    which doesn't fire post_save for each of them.
+    """
+    if not SEND_ADMIN_EMAILS:
+        return
+    try:
+        queue_admin_notification(
+            subject=f"🔔 {len(instances)} New Service Requests",
+            message='\n'.join(service_request_message(instance) for instance in instances),
+            description=f"Service request notification ({len(instances)} requests)"
+        )
+        logger.info(f"{len(instances)} service request notifications queued for admin")
+        
+    except Exception as e:
+        logger.error(f"Failed to queue service request notification: {str(e)}")
+
+# =============================================================================
+# SERIALIZED USER CACHE
+# =============================================================================
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached CustomUserSerializer output for this user"""
+    cache.delete(user_cache_key(instance.pk))
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_user_cache(sender, instance, **kwargs):
+    """The user's serialized output embeds their profile"""
+    if instance.user_id:
+        cache.delete(user_cache_key(instance.user_id))
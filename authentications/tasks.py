@@ -0,0 +1,283 @@
+"""
+Background email delivery for authentication emails.
+Messages are written to the EmailOutbox in the caller's transaction and sent
+after it commits, so the request doesn't wait on the Resend API and a crash
+between the two leaves a pending row for flush_email_outbox to retry.
+"""
+
+import logging
+import os
+import queue
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# Rows are marked failed after this many unsuccessful sends
+MAX_SEND_ATTEMPTS = 5
+
+# A row claimed for sending this long ago is assumed to belong to a dead worker
+STALE_SENDING_AFTER = timedelta(minutes=10)
+
+# Pending emails are flushed this many per backend call (Resend's batch limit)
+FLUSH_BATCH_SIZE = 100
+
+# Seconds the delivery thread waits for more email before closing its connection
+DELIVERY_IDLE_TIMEOUT = 30
+
+# Each thread keeps one open email backend connection and reuses it
+_mail = threading.local()
+
+
+def get_connection_cached():
+    """
+    Return this thread's open email connection, opening one on first use.
+    Sends through it skip the per-email connect/handshake.
+    """
+    conn = getattr(_mail, 'connection', None)
+    if conn is None or _mail.backend != settings.EMAIL_BACKEND:
+        close_cached_connection()
+        conn = get_connection()
+        conn.open()
+        _mail.connection = conn
+        _mail.backend = settings.EMAIL_BACKEND
+    return conn
+
+
+def close_cached_connection():
+    conn = getattr(_mail, 'connection', None)
+    _mail.connection = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing email connection: {str(e)}")
+
+
+def deliver_outbox(outbox_id):
+    """
+    Send a single outbox email via Resend; returns True when it was sent
+    """
+    # Claim the row so a concurrent flush can't send it twice
+    claimed = EmailOutbox.objects.filter(
+        pk=outbox_id,
+        status=EmailOutbox.STATUS_PENDING
+    ).update(status=EmailOutbox.STATUS_SENDING, updated_at=timezone.now())
+    if not claimed:
+        return False
+
+    email = EmailOutbox.objects.get(pk=outbox_id)
+    recipients = email.recipient_list
+    attempts = email.attempts + 1
+    try:
+        send_mail(
+            subject=email.subject,
+            message=email.body,
+            from_email=email.from_email,
+            recipient_list=recipients,
+            fail_silently=False,
+            html_message=email.html_body or None,
+            connection=get_connection_cached()
+        )
+    except Exception as e:
+        logger.error(f"Failed to send {email.description} via Resend: {str(e)}")
+        # The connection may be what failed; start the next send on a fresh one
+        close_cached_connection()
+        status = EmailOutbox.STATUS_FAILED if attempts >= MAX_SEND_ATTEMPTS else EmailOutbox.STATUS_PENDING
+        EmailOutbox.objects.filter(pk=outbox_id).update(
+            status=status,
+            attempts=attempts,
+            last_error=str(e),
+            updated_at=timezone.now()
+        )
+        return False
+
+    now = timezone.now()
+    EmailOutbox.objects.filter(pk=outbox_id).update(
+        status=EmailOutbox.STATUS_SENT,
+        attempts=attempts,
+        last_error='',
+        sent_at=now,
+        updated_at=now
+    )
+    logger.info(f"{email.description} sent via Resend to {', '.join(recipients)}")
+    return True
+
+
+def _deliver_outbox_batch(outbox_ids):
+    """
+    Send a group of outbox emails in one backend call (a single Resend batch
+    request). If the batch is rejected the emails are retried one by one, so
+    one bad address can't hold back the rest. Returns (sent, unsent).
+    """
+    # Claim the rows; the claim time tells our rows apart from another worker's
+    claimed_at = timezone.now()
+    EmailOutbox.objects.filter(
+        pk__in=outbox_ids,
+        status=EmailOutbox.STATUS_PENDING
+    ).update(status=EmailOutbox.STATUS_SENDING, updated_at=claimed_at)
+    emails = list(EmailOutbox.objects.filter(
+        pk__in=outbox_ids,
+        status=EmailOutbox.STATUS_SENDING,
+        updated_at=claimed_at
+    ))
+    if not emails:
+        return 0, 0
+
+    claimed = [email.pk for email in emails]
+    messages = []
+    for email in emails:
+        message = EmailMultiAlternatives(email.subject, email.body, email.from_email, email.recipient_list)
+        if email.html_body:
+            message.attach_alternative(email.html_body, 'text/html')
+        messages.append(message)
+    try:
+        get_connection_cached().send_messages(messages)
+    except Exception as e:
+        logger.error(f"Failed to send batch of {len(emails)} emails via Resend: {str(e)}")
+        close_cached_connection()
+        EmailOutbox.objects.filter(pk__in=claimed).update(status=EmailOutbox.STATUS_PENDING)
+        sent = sum(deliver_outbox(outbox_id) for outbox_id in claimed)
+        return sent, len(claimed) - sent
+
+    now = timezone.now()
+    EmailOutbox.objects.filter(pk__in=claimed).update(
+        status=EmailOutbox.STATUS_SENT,
+        attempts=F('attempts') + 1,
+        last_error='',
+        sent_at=now,
+        updated_at=now
+    )
+    logger.info(f"Sent {len(emails)} outbox emails via Resend")
+    return len(emails), 0
+
+
+def flush_outbox():
+    """
+    Retry every pending email, plus any stuck in 'sending' by a dead worker,
+    in batches of FLUSH_BATCH_SIZE. Returns (sent, unsent) counts.
+    """
+    EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_SENDING,
+        updated_at__lt=timezone.now() - STALE_SENDING_AFTER
+    ).update(status=EmailOutbox.STATUS_PENDING)
+
+    pending_ids = list(EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_PENDING
+    ).order_by('created_at').values_list('pk', flat=True))
+
+    sent = unsent = 0
+    try:
+        for start in range(0, len(pending_ids), FLUSH_BATCH_SIZE):
+            batch_sent, batch_unsent = _deliver_outbox_batch(pending_ids[start:start + FLUSH_BATCH_SIZE])
+            sent += batch_sent
+            unsent += batch_unsent
+    finally:
+        close_cached_connection()
+    return sent, unsent
+
+
+def purge_outbox(days):
+    """Delete emails sent more than `days` days ago; returns the number removed"""
+    deleted, _ = EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_SENT,
+        sent_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
+
+
+# Optional: Celery tasks for background delivery (if Celery is installed)
+try:
+    from celery import shared_task
+
+    @shared_task
+    def deliver_outbox_task(outbox_id):
+        return deliver_outbox(outbox_id)
+
+    @shared_task
+    def flush_outbox_task():
+        # Suitable for a periodic (beat) schedule
+        return flush_outbox()
+
+except ImportError:
+    # Celery not available, emails are sent from a background thread
+    deliver_outbox_task = None
+
+
+def _delivery_worker(outbox_ids):
+    """
+    Send queued outbox ids one after another, so consecutive emails share
+    the thread's cached connection. After DELIVERY_IDLE_TIMEOUT seconds
+    without work the connection is closed until the next email arrives.
+    """
+    while True:
+        try:
+            outbox_id = outbox_ids.get(timeout=DELIVERY_IDLE_TIMEOUT)
+        except queue.Empty:
+            close_cached_connection()
+            connections.close_all()
+            outbox_id = outbox_ids.get()
+        # Like a request, drop a database connection that is too old or broken
+        close_old_connections()
+        try:
+            deliver_outbox(outbox_id)
+        except Exception as e:
+            # The row stays pending or sending for flush_email_outbox to retry
+            logger.error(f"Outbox delivery of email {outbox_id} failed: {str(e)}")
+
+
+_delivery = {'pid': None, 'queue': None}
+_delivery_lock = threading.Lock()
+
+
+def _delivery_queue():
+    """
+    Queue feeding this process's delivery thread, started on first use (a
+    thread started before a fork doesn't exist in the child processes).
+    """
+    pid = os.getpid()
+    if _delivery['pid'] != pid:
+        with _delivery_lock:
+            if _delivery['pid'] != pid:
+                outbox_ids = queue.SimpleQueue()
+                threading.Thread(
+                    target=_delivery_worker,
+                    args=(outbox_ids,),
+                    name='email-outbox',
+                    daemon=True
+                ).start()
+                _delivery['queue'] = outbox_ids
+                _delivery['pid'] = pid
+    return _delivery['queue']
+
+
+def queue_mail(subject, message, from_email, recipient_list, description, html_message=None):
+    """
+    Write the email to the outbox and send it once the current transaction
+    commits. Uses Celery when a broker is configured, otherwise the process's
+    delivery thread.
+    """
+    email = EmailOutbox.objects.create(
+        from_email=from_email,
+        to=','.join(recipient_list),
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        description=description
+    )
+    outbox_id = email.pk
+
+    def enqueue():
+        if deliver_outbox_task is not None and getattr(settings, 'CELERY_BROKER_URL', None):
+            deliver_outbox_task.delay(outbox_id)
+        else:
+            _delivery_queue().put(outbox_id)
+
+    transaction.on_commit(enqueue)
+    return email
@@ -24,6 +24,7 @@ urlpatterns = [
     
     # Service request, review, and contact endpoints
     path('request-service/', views.request_service, name='request_service'),
+    path('request-service/bulk/', views.bulk_request_service, name='bulk_request_service'),
     path('submit-review/', views.submit_review, name='submit_review'),
     path('submit-contact/', views.submit_contact, name='submit_contact'),
 ]
@@ -3,25 +3,38 @@ from django.contrib.auth.hashers import make_password
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework import serializers, status
 from django.contrib.auth import get_user_model
-from .models import OTP, UserProfile , CustomUser, RequestService, Review, Contact
+from django.core.cache import cache
+from django.db import transaction
+from .models import UserProfile , CustomUser, RequestService, Review, Contact
+from . import otp_store
+from .signals import (
+    SEND_ADMIN_EMAILS,
+    format_timestamp,
+    queue_otp_email,
+    queue_service_requests_notification
+)
+from .tasks import queue_mail
 from .serializers import (
+    user_cache_key,
     CustomUserSerializer,
     CustomUserCreateSerializer,
     UserProfileSerializer,
-    OTPSerializer,
     LoginSerializer,
     RequestServiceSerializer,
     ReviewSerializer,
     ContactSerializer
 )
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-import random
+import logging
+import secrets
+
+logger = logging.getLogger(__name__)
 
 def error_response(code, message="Error", details=None):
     return Response({
@@ -38,49 +51,17 @@ def success_response(message="Success", data=None, code=200):
     }, status=code)
 
 def generate_otp():
-    return str(random.randint(100000, 999999))
+    # secrets draws from the OS CSPRNG; random is predictable
+    return f"{secrets.randbelow(900000) + 100000:06d}"
 
-User = get_user_model()
+def issue_otp(email, password_reset=False):
+    """Store a fresh OTP for email (replacing any previous one) and queue its email"""
+    otp = generate_otp()
+    otp_store.store(email, otp)
+    queue_otp_email(email, otp, password_reset=password_reset)
+    return otp
 
-def send_otp_email(email, otp):
-    """
-    Smart OTP email sending with guaranteed console fallback
-    """
-    from django.conf import settings
-    
-    # Console output for testing and debugging
-    print(f"📧 Sending OTP to: {email}")
-    print(f"📱 OTP: {otp}")
-    
-    # Check if this is a test email
-    test_domains = ['example.com', 'test.com', 'testing.com']
-    domain = email.split('@')[-1].lower()
-    is_test_email = domain in test_domains
-    
-    if is_test_email:
-        print("ℹ️ Test email domain - Console output only")
-        return
-    
-    # Try to send real email for non-test addresses
-    try:
-        html_content = render_to_string('otp_email_template.html', {'otp': otp, 'email': email})
-        msg = EmailMultiAlternatives(
-            subject='Your OTP Code - AutoMarket',
-            body=f'Your OTP verification code is: {otp}',
-            from_email=settings.EMAIL_HOST_USER or 'noreply@automarket.com',
-            to=[email]
-        )
-        msg.attach_alternative(html_content, "text/html")
-        msg.send(fail_silently=False)
-        print(f"✅ EMAIL SENT to: {email}")
-        print("="*60 + "\n")
-    except Exception as e:
-        print(f"❌ EMAIL FAILED: {str(e)}")
-        print("💡 Use the OTP from console output above")
-        print("="*60 + "\n")
-        print("="*60)
-        print("Email failed - showing OTP in console")
-        print("="*60 + "\n")
+User = get_user_model()
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -91,21 +72,12 @@ def register_user(request):
     """
     serializer = CustomUserCreateSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
+        try:
+            user = serializer.save()
+        except serializers.ValidationError as e:
+            return error_response(code=400, details=e.detail)
         # Send OTP for verification
-        otp = generate_otp()
-        otp_data = {'email': user.email, 'otp': otp}
-        otp_serializer = OTPSerializer(data=otp_data)
-        if otp_serializer.is_valid():
-            otp_serializer.save()
-            try:
-                send_otp_email(email=user.email, otp=otp)
-            except Exception as e:
-                return error_response(
-                    code=500,
-                    message="Failed to send OTP email",
-                    details={"error": [str(e)]}
-                )
+        issue_otp(user.email)
         return success_response(
             message="User registered successfully. Please verify your email with the OTP sent",
             data={
@@ -130,10 +102,9 @@ def login(request):
     if serializer.is_valid():
         user = serializer.validated_data
         refresh = RefreshToken.for_user(user)
-        try:
-            profile = user.user_profile
-        except UserProfile.DoesNotExist:
-            profile = UserProfile.objects.create(user=user)
+        # Missing profiles raise RelatedObjectDoesNotExist, an AttributeError;
+        # only accounts from before profiles were created on signup lack one
+        profile = getattr(user, 'user_profile', None) or UserProfile.objects.get_or_create(user=user)[0]
         
         profile_serializer = UserProfileSerializer(profile, context={'request': request})
         return success_response(
@@ -153,14 +124,38 @@ def login(request):
         )
     return error_response(code=401, details=serializer.errors)
 
+class UserListPagination(LimitOffsetPagination):
+    max_limit = 500
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_users(request):
-    users = User.objects.all()
-    serializer = CustomUserSerializer(users, many=True)
+    """
+    List all users; pass ?limit=&offset= to fetch one page at a time
+    """
+    # Only the columns CustomUserSerializer and UserProfileSerializer read
+    users = User.objects.select_related('user_profile').only(
+        'id', 'email', 'full_name', 'role', 'is_verified',
+        'user_profile__id', 'user_profile__user', 'user_profile__profile_picture',
+        'user_profile__phone_number', 'user_profile__address', 'user_profile__joined_date'
+    ).order_by('id')
+    
+    # Without ?limit= the whole list is returned, as before
+    paginator = UserListPagination()
+    page = paginator.paginate_queryset(users, request)
+    if page is None:
+        return success_response(
+            message="Users fetched successfully",
+            data={"users": CustomUserSerializer(users, many=True).data}
+        )
     return success_response(
         message="Users fetched successfully",
-        data={"users": serializer.data}
+        data={
+            "users": CustomUserSerializer(page, many=True).data,
+            "count": paginator.count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link()
+        }
     )
 
 @api_view(['GET', 'PUT'])
@@ -170,10 +165,8 @@ def user_profile(request):
     GET: Shows user profile with full_name and email (read-only)
     PUT: Update profile (only phone, address, profile_picture - NOT name or email)
     """
-    try:
-        profile = request.user.user_profile
-    except UserProfile.DoesNotExist:
-        profile = UserProfile.objects.create(user=request.user)
+    # Only accounts from before profiles were created on signup lack one
+    profile = getattr(request.user, 'user_profile', None) or UserProfile.objects.get_or_create(user=request.user)[0]
 
     if request.method == 'GET':
         user = request.user
@@ -201,7 +194,7 @@ def user_profile(request):
         if 'profile_picture' in request.FILES:
             update_data['profile_picture'] = request.FILES['profile_picture']
         
-        print(f"Update data: {update_data}")  # Debug print
+        logger.debug("Update data: %s", update_data)
         
         serializer = UserProfileSerializer(profile, data=update_data, partial=True, context={'request': request})
         if serializer.is_valid():
@@ -211,7 +204,7 @@ def user_profile(request):
                 data={"profile": serializer.data}
             )
         else:
-            print(f"Serializer errors: {serializer.errors}")  # Debug print
+            logger.debug("Serializer errors: %s", serializer.errors)
             return error_response(code=400, message="Validation failed", details=serializer.errors)
 
 @api_view(['POST'])
@@ -237,32 +230,14 @@ def create_otp(request):
             details={"email": ["No user exists with this email"]}
         )
     
-    otp = generate_otp()
-    print(f"📧 Creating OTP for: {email}")
-    
-    # Delete any existing OTP first
-    OTP.objects.filter(email=email).delete()
+    logger.debug("Creating OTP for %s", email)
     
-    otp_data = {'email': email, 'otp': otp}
-    serializer = OTPSerializer(data=otp_data)
-    if serializer.is_valid():
-        serializer.save()
-        print(f"✅ OTP created and saved successfully")
-        
-        try:
-            send_otp_email(email=email, otp=otp)
-        except Exception as e:
-            print(f"❌ EMAIL FAILED: {str(e)}")
-            return error_response(
-                code=500,
-                message="Failed to send OTP email",
-                details={"error": [str(e)]}
-            )
-        return success_response(
-            message="OTP sent to your email",
-            code=201
-        )
-    return error_response(code=400, details=serializer.errors)
+    # Replaces any existing OTP
+    issue_otp(email)
+    return success_response(
+        message="OTP sent to your email",
+        code=201
+    )
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -279,8 +254,8 @@ def verify_otp_reset(request):
         return error_response(code=400, details=details)
     
     try:
-        otp_obj = OTP.objects.get(email=email)
-        if otp_obj.otp != otp_value:
+        otp_obj = otp_store.get(email)
+        if not otp_obj.matches(otp_value):
             return error_response(
                 code=400,
                 details={"otp": ["The provided OTP is invalid"]}
@@ -291,7 +266,7 @@ def verify_otp_reset(request):
                 details={"otp": ["The OTP has expired"]}
             )
         return success_response(message="OTP verified successfully")
-    except OTP.DoesNotExist:
+    except otp_store.OTPNotFound:
         return error_response(
             code=404,
             details={"email": ["No OTP found for this email"]})
@@ -310,47 +285,50 @@ def verify_otp(request):
             details["otp"] = ["This field is required"]
         return error_response(code=400, details=details)
     
-    # Convert OTP to string and strip whitespace
-    otp_value = str(otp_value).strip()
-    
     try:
-        otp_obj = OTP.objects.get(email=email)
-        db_otp = str(otp_obj.otp).strip()
+        otp_obj, user = otp_store.get_with_user(email)
         
         if otp_obj.is_expired():
-            otp_obj.delete()  # Clean up expired OTP
+            otp_store.delete(email)  # Clean up expired OTP
             return error_response(
                 code=400,
                 details={"otp": ["The OTP has expired. Please request a new one"]}
             )
         
-        if db_otp != otp_value:
+        if not otp_obj.matches(otp_value):
             return error_response(
                 code=400,
                 details={"otp": ["The provided OTP is invalid"]}
             )
         
         # Verify the user
-        try:
-            user = User.objects.get(email=email)
-            if user.is_verified:
-                otp_obj.delete()  # Clean up OTP
-                return error_response(
-                    code=400,
-                    details={"email": ["This account is already verified"]}
-                )
-            user.is_verified = True
-            user.save()
-            otp_obj.delete()
-            print(f"✅ Email verified successfully for: {email}")
-            return success_response(message="Email verified successfully. You can now log in")
-        except User.DoesNotExist:
+        if user is None:
             return error_response(
                 code=404,
                 details={"email": ["No user exists with this email"]}
             )
-    except OTP.DoesNotExist:
-        print("❌ NO OTP FOUND")
+        if user.is_verified:
+            otp_store.delete(email)  # Clean up OTP
+            return error_response(
+                code=400,
+                details={"email": ["This account is already verified"]}
+            )
+        # The is_verified=False filter makes a concurrent retry of the same
+        # code a no-op instead of a second verification
+        with transaction.atomic():
+            verified = User.objects.filter(pk=user.pk, is_verified=False).update(is_verified=True)
+            otp_store.delete(email)
+        if not verified:
+            return error_response(
+                code=400,
+                details={"email": ["This account is already verified"]}
+            )
+        # update() skips post_save, so drop the cached serialized user here
+        cache.delete(user_cache_key(user.pk))
+        logger.debug("Email verified for %s", email)
+        return success_response(message="Email verified successfully. You can now log in")
+    except otp_store.OTPNotFound:
+        logger.debug("No OTP found for %s", email)
         return error_response(
             code=404,
             details={"email": ["No OTP found for this email. Please request a new OTP"]}
@@ -379,25 +357,11 @@ def request_password_reset(request):
             details={"email": ["No user exists with this email"]}
         )
 
-    otp = generate_otp()
-    otp_data = {'email': email, 'otp': otp}
-    OTP.objects.filter(email=email).delete()
-    serializer = OTPSerializer(data=otp_data)
-    if serializer.is_valid():
-        serializer.save()
-        try:
-            send_otp_email(email=email, otp=otp)
-        except Exception as e:
-            return error_response(
-                code=500,
-                message="Failed to send OTP email",
-                details={"error": [str(e)]}
-            )
-        return success_response(
-            message="OTP sent to your email",
-            code=201
-        )
-    return error_response(code=400, details=serializer.errors)
+    issue_otp(email, password_reset=True)
+    return success_response(
+        message="OTP sent to your email",
+        code=201
+    )
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -416,14 +380,18 @@ def reset_password(request):
         return error_response(code=400, details=details)
 
     try:
-        otp_obj = OTP.objects.get(email=email)
-        if otp_obj.otp != otp_value:
+        otp_obj, user = otp_store.get_with_user(email)
+        if not otp_obj.matches(otp_value):
             return error_response(
                 code=400,
                 details={"otp": ["The provided OTP is invalid"]}
             )
        
-        user = User.objects.get(email=email)
+        if user is None:
+            return error_response(
+                code=404,
+                details={"email": ["No user exists with this email"]}
+            )
         if not user.is_verified:
             return error_response(
                 code=400,
@@ -439,18 +407,13 @@ def reset_password(request):
 
         user.set_password(new_password)
         user.save()
-        otp_obj.delete()
+        otp_store.delete(email)
         return success_response(message='Password reset successful')
-    except OTP.DoesNotExist:
+    except otp_store.OTPNotFound:
         return error_response(
             code=404,
             details={"email": ["No OTP found for this email"]}
         )
-    except User.DoesNotExist:
-        return error_response(
-            code=404,
-            details={"email": ["No user exists with this email"]}
-        )
 
 
 @api_view(['POST'])
@@ -469,7 +432,14 @@ def refresh_token(request):
     try:
         refresh = RefreshToken(refresh_token)
         new_access = str(refresh.access_token)
-        new_refresh = str(refresh)  # new refresh token (if needed)
+        # Only sign a new refresh token when rotation is on; otherwise the
+        # client keeps the one it sent
+        new_refresh = refresh_token
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            new_refresh = str(refresh)
 
         return success_response(
             message="Token refreshed successfully",
@@ -487,19 +457,20 @@ def refresh_token(request):
 
 
 def send_admin_email(subject, message):
-    """Helper function to send email to admin"""
+    """Helper function to queue an email to admin; sent after the request commits"""
+    if not SEND_ADMIN_EMAILS:
+        return False
     try:
-        from django.core.mail import send_mail
-        send_mail(
-            subject,
-            message,
-            'alecgold808@gmail.com',  # From email
-            ['alecgold808@gmail.com'],  # To email
-            fail_silently=False,
+        queue_mail(
+            subject=subject,
+            message=message,
+            from_email='alecgold808@gmail.com',  # From email
+            recipient_list=['alecgold808@gmail.com'],  # To email
+            description="Admin email"
         )
         return True
     except Exception as e:
-        print(f"Email sending failed: {str(e)}")
+        logger.error("Email sending failed: %s", e)
         return False
 
 
@@ -529,7 +500,7 @@ Estimated Total Value: {instance.estimated_total_value}
 Preferred Timeframe: {instance.preferred_timeframe}
 Additional Information: {instance.additional_information or 'None'}
 
-Submitted on: {instance.created_at.strftime('%Y-%m-%d %H:%M:%S')}
+Submitted on: {format_timestamp(instance.created_at)}
             """
             
             # Send email to admin
@@ -556,6 +527,61 @@ Submitted on: {instance.created_at.strftime('%Y-%m-%d %H:%M:%S')}
         )
 
 
+# Upper bound on the rows one bulk_request_service call may insert
+MAX_BULK_SERVICE_REQUESTS = 1000
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_request_service(request):
+    """
+    Import a list of service requests (e.g. from a CSV) with one bulk INSERT
+    and a single admin notification for the whole batch
+    """
+    if not isinstance(request.data, list) or not request.data:
+        return error_response(
+            code=400,
+            message="Expected a non-empty list of service requests"
+        )
+    if len(request.data) > MAX_BULK_SERVICE_REQUESTS:
+        return error_response(
+            code=400,
+            message=f"At most {MAX_BULK_SERVICE_REQUESTS} service requests can be submitted at once"
+        )
+
+    serializer = RequestServiceSerializer(data=request.data, many=True)
+    if not serializer.is_valid():
+        return error_response(
+            code=400,
+            message="Invalid data provided",
+            details={"errors": serializer.errors}
+        )
+
+    try:
+        # bulk_create skips post_save, so the notification is queued here;
+        # it goes out once the rows are committed
+        with transaction.atomic():
+            instances = RequestService.objects.bulk_create(
+                [RequestService(**data) for data in serializer.validated_data],
+                batch_size=500
+            )
+            queue_service_requests_notification(instances)
+    except Exception as e:
+        return error_response(
+            code=500,
+            message="Failed to submit service requests",
+            details={"error": str(e)}
+        )
+
+    return success_response(
+        message="Service requests submitted successfully",
+        data={
+            "count": len(instances),
+            "request_ids": [instance.id for instance in instances]
+        },
+        code=201
+    )
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def submit_review(request):
@@ -575,7 +601,7 @@ Email: {instance.email}
 Rating: {instance.rating} out of 5 stars
 Review: {instance.your_review}
 
-Submitted on: {instance.created_at.strftime('%Y-%m-%d %H:%M:%S')}
+Submitted on: {format_timestamp(instance.created_at)}
             """
             
             # Send email to admin
@@ -620,7 +646,7 @@ Your Name: {instance.your_name}
 Your Email: {instance.your_email}
 Your Message: {instance.your_message}
 
-Submitted on: {instance.created_at.strftime('%Y-%m-%d %H:%M:%S')}
+Submitted on: {format_timestamp(instance.created_at)}
             """
             
             # Send email to admin
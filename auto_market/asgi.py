@@ -11,7 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from auto_market.warmup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auto_market.settings')
 
 application = get_asgi_application()
 
+warm_up()
+
@@ -0,0 +1,62 @@
+"""
+Logging handlers for the project.
+"""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class _ProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler whose listener thread is started by the first record each
+    process emits. A thread started before a fork (e.g. gunicorn --preload)
+    doesn't exist in the children, so each worker gets its own queue and
+    listener. The queue is bounded; records that arrive while it is full
+    are dropped rather than blocking the caller.
+    """
+
+    def __init__(self, stream, maxsize):
+        super().__init__(queue.Queue(maxsize))
+        self.stream = stream
+        self.maxsize = maxsize
+        self.listener = None
+        self.pid = None
+        atexit.register(self.stop)
+
+    def start(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = QueueListener(self.queue, logging.StreamHandler(self.stream))
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def stop(self):
+        # Drain what's queued; only this process's listener can be stopped
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+
+    def emit(self, record):
+        # handle() holds the handler lock here, so only one thread starts it
+        if self.pid != os.getpid():
+            self.start()
+        super().emit(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def queued_stream_handler(stream=None, maxsize=10000):
+    """
+    Console handler that hands records to a background thread for writing,
+    so a slow stdout (e.g. a blocked Docker log driver) never stalls a request.
+    Records are formatted with the returned handler's formatter before being
+    queued. Used from LOGGING as a '()' factory, since dictConfig treats
+    QueueHandler classes specially on Python 3.12+.
+    """
+    return _ProcessQueueHandler(stream, maxsize)
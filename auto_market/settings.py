@@ -77,11 +77,14 @@ CORS_ALLOWED_ORIGINS = [
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # No autodiscover; urls.py imports the admin modules when the admin is enabled
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # Must precede staticfiles so runserver leaves /static/ to WhiteNoise
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -104,10 +107,14 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'auto_market.urls'
 
+# Django admin: set ENABLE_ADMIN=False to leave it unmounted, ADMIN_URL to move it
+ENABLE_ADMIN = os.getenv('ENABLE_ADMIN', 'True').lower() == 'true'
+ADMIN_URL = os.getenv('ADMIN_URL', 'admin/').strip('/') + '/'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': ['templates'],
+        'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -128,9 +135,37 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests instead of reconnecting every
+        # time; health checks drop connections the server has closed
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Redis (needs the redis package) when REDIS_URL is set, otherwise per-process memory
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# OTP codes are kept in the cache only when it is shared between workers
+OTP_STORE = os.getenv('OTP_STORE', 'cache' if REDIS_URL else 'db')
+
+# Likewise for serialized users: a per-process cache can't be invalidated
+# in the other workers, so they would keep serving stale profiles and roles
+USER_CACHE = os.getenv('USER_CACHE', str(bool(REDIS_URL))).lower() == 'true'
+
+# Log OTP codes at DEBUG level (only honoured when DEBUG is on)
+OTP_CONSOLE_LOG = os.getenv('OTP_CONSOLE_LOG', 'False').lower() == 'true'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -175,7 +210,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # STATICFILES_DIRS = [
 #     BASE_DIR / 'static',  # Project-level static files
 # ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Django 5.1 dropped STATICFILES_STORAGE; storages are configured here.
+# collectstatic writes content-hashed, precompressed copies of every file,
+# which WhiteNoise serves with a one-year immutable Cache-Control.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 
 # Static files finders
@@ -193,6 +239,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files (User uploads like profile pictures and product images)
 
+# Scheme and host prepended to media URLs built without a request; when
+# unset those URLs stay relative (MEDIA_URL + file name)
+MEDIA_HOST = os.getenv('MEDIA_HOST', '').rstrip('/')
+
 
 # Ensure media directory exists
 # os.makedirs(MEDIA_ROOT, exist_ok=True)
@@ -217,14 +267,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT settings
 from datetime import timedelta
 SIMPLE_JWT = {
+    'ALGORITHM': 'HS256',
+    'SIGNING_KEY': SECRET_KEY,
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
-    'ROTATE_REFRESH_TOKENS': True,
+    # When off, /refresh/ returns the caller's refresh token instead of signing a new one
+    'ROTATE_REFRESH_TOKENS': os.getenv('JWT_ROTATE_REFRESH_TOKENS', 'True').lower() == 'true',
 }
 
 # Email Configuration using Resend (Modern Email Service)
@@ -234,6 +291,9 @@ RESEND_API_KEY = os.getenv('RESEND_API_KEY', 're_Y66VkqNr_AR4QkbTTF2buCkeCJ7bp9a
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@bluberryhq.com')
 ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'alecgold808@gmail.com')
 
+# Set to False (e.g. in dev/CI) to skip the admin notification emails
+SEND_ADMIN_EMAILS = os.getenv('SEND_ADMIN_EMAILS', 'True').lower() == 'true'
+
 # Use Resend for email sending
 EMAIL_BACKEND = 'api.resend_backend.ResendEmailBackend'
 
@@ -302,7 +362,8 @@ LOGGING = {
     },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            # Writes happen on a background thread, off the request path
+            '()': 'auto_market.log.queued_stream_handler',
             'formatter': 'simple',
         },
     },
@@ -316,6 +377,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'authentications': {
+            'handlers': ['console'],
+            'level': 'DEBUG' if DEBUG else 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -17,33 +17,101 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
-from django.shortcuts import render
+from django.views.static import serve
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+from django.views.generic import RedirectView
+from datetime import datetime, timezone
+import hashlib
+import os
 
-from api.views import api_test, ebay_test_page
+from api.routing import cached
 
-def privacy_policy(request):
-    return render(request, 'privacy_policy.html')
+def static_page(template_name, max_age=86400):
+    """
+    View for a template that uses no variables. The page is rendered on the
+    first request and each later request just sends the bytes. The ETag is a
+    hash of the same bytes and Last-Modified the template file's mtime, so
+    revisits get a 304 and caches may keep the page for max_age seconds.
+    """
+    page = None
 
-def about(request):
-    return render(request, 'about.html')
+    def load():
+        # Rendering at import would make every route depend on the template
+        # being found; a concurrent first request at worst renders it twice
+        nonlocal page
+        if page is None:
+            template = get_template(template_name)
+            html = template.render().encode()
+            page = (
+                html,
+                hashlib.md5(html, usedforsecurity=False).hexdigest(),
+                datetime.fromtimestamp(os.path.getmtime(template.origin.name), tz=timezone.utc),
+                str(len(html)),
+            )
+        return page
 
+    @require_safe
+    @cache_control(public=True, max_age=max_age)
+    @condition(etag_func=lambda request: load()[1], last_modified_func=lambda request: load()[2])
+    def view(request):
+        html, _, _, content_length = load()
+        if request.method == 'HEAD':
+            # Cache revalidation probes only need the headers
+            response = HttpResponse()
+            response['Content-Length'] = content_length
+            return response
+        return HttpResponse(html)
+    return view
+
+# Almost all traffic is under api/, so those routes share one subtree: other
+# requests skip it after a single prefix check, and repeated API paths are
+# resolved from a cache.
+api_urlpatterns = [
+    # auth/ stays ahead of the catch-all '' include: one prefix check here
+    # spares auth requests a full scan of api.urls
+    path('auth/', include('authentications.urls')),
+    # Also serves the Amazon OAuth URLs and API callbacks under amazon/
+    path('', include('api.urls')),
+]
+
+# Ordered by expected request volume, since Django resolves with a linear scan
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/auth/', include('authentications.urls')),
-    path('api/', include('api.urls')),
-    path('api/test/', api_test, name='api_test'),
-    path('test/', ebay_test_page, name='ebay_test_page'),
-    path('amazon/', include('api.amazon_urls')),  # Amazon OAuth URLs
-    path('api/amazon/', include('api.amazon_urls')),  # Amazon API callbacks
-    path('privacy/', privacy_policy, name='privacy_policy'),
-    path('privacy-policy/', privacy_policy, name='privacy_policy_amazon'),  # Amazon LWA compliance
-    path('about/', about, name='about'),
+    cached(path('api/', include(api_urlpatterns))),
+    path('privacy-policy/', static_page('privacy_policy.html'), name='privacy_policy'),  # Amazon LWA compliance
+    path('about/', static_page('about.html'), name='about'),
+    # Legacy URLs, kept as redirects
+    path('privacy/', RedirectView.as_view(pattern_name='privacy_policy', permanent=True)),
+    # Old unprefixed Amazon OAuth URLs; the query string carries the OAuth parameters
+    path('amazon/<path:rest>', RedirectView.as_view(url='/api/amazon/%(rest)s', permanent=True, query_string=True)),
 ]
 
-# Serve static and media files during development
+# Deployments without the Django admin skip its URLs entirely; when enabled
+# it is tried after the public routes
+if settings.ENABLE_ADMIN:
+    # Registers the ModelAdmins; these are the only apps with an admin module
+    import django.contrib.auth.admin  # noqa: F401
+    import authentications.admin  # noqa: F401
+    import api.admin  # noqa: F401
+
+    urlpatterns.append(path(settings.ADMIN_URL, admin.site.urls))
+
+# The API and eBay test pages only exist in development
+if settings.DEBUG:
+    from api.views import api_test, ebay_test_page
+
+    api_urlpatterns.append(path('test/', api_test, name='api_test'))
+    urlpatterns.append(path('test/', ebay_test_page, name='ebay_test_page'))
+
+# Static files are served by WhiteNoiseMiddleware before URL resolution.
+# Uploaded media is served here during development only; WhiteNoise indexes
+# files at startup, so it can't serve uploads made while the server runs.
+# A path converter keeps this off the regex route that static() would add.
 if settings.DEBUG:
-    # Serve static files
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    # Serve media files
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns.append(path(
+        f"{settings.MEDIA_URL.strip('/')}/<path:path>",
+        serve,
+        {'document_root': settings.MEDIA_ROOT}
+    ))
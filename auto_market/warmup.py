@@ -0,0 +1,14 @@
+"""
+Startup work shared by the WSGI and ASGI entry points.
+"""
+
+from django.urls import get_resolver
+
+
+def warm_up():
+    """
+    Import every URLconf, compile every route pattern and build the
+    resolver's reverse and namespace lookups at startup, so the first
+    request handled by each worker does not pay for it.
+    """
+    get_resolver()._populate()
@@ -11,6 +11,10 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from auto_market.warmup import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auto_market.settings')
 
 application = get_wsgi_application()
+
+warm_up()